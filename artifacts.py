@@ -0,0 +1,137 @@
+"""Versioned on-disk store for the fitted scaler + classifier.
+
+Each artifact lives in ``<ARTIFACT_DIR>/<version>/`` as a pickled bundle plus a
+``meta.json`` describing the training data hash and the library versions it was
+built with.  ``<ARTIFACT_DIR>/CURRENT`` names the version the app should serve.
+"""
+import hashlib
+import json
+import os
+import pickle
+import platform
+import time
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+ARTIFACT_DIR = os.environ.get(
+    "DIABETES_ARTIFACT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".model_cache"),
+)
+SCHEMA = 1
+
+
+# ── Fingerprints ──────────────────────────────────────────────────────────────
+def data_hash(data):
+    """SHA-256 of the training frame's columns and values (index ignored)."""
+    h = hashlib.sha256()
+    h.update(",".join(map(str, data.columns)).encode())
+    h.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def library_versions():
+    # Pickled sklearn objects are only safe to reload under the same versions.
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def make_version(digest, params=None):
+    payload = json.dumps({"data": digest, "params": params or {},
+                          "libs": library_versions(), "schema": SCHEMA},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+# ── Read / write ──────────────────────────────────────────────────────────────
+def _write_atomic(path, payload, mode="wb"):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, mode) as fh:
+        fh.write(payload)
+    os.replace(tmp, path)
+
+
+def save(bundle, digest, source=None, params=None, root=None, extra=None, activate=True):
+    """Persist ``bundle`` as a new version and, if ``activate``, point CURRENT at it.
+
+    ``extra`` is merged into ``meta.json`` (e.g. lineage of incremental updates).
+    """
+    root = root or ARTIFACT_DIR
+    version = make_version(digest, params)
+    vdir = os.path.join(root, version)
+    os.makedirs(vdir, exist_ok=True)
+    meta = {
+        "schema": SCHEMA,
+        "version": version,
+        "data_hash": digest,
+        "source": source,
+        "params": params or {},
+        "libs": library_versions(),
+        "created": time.time(),
+        **(extra or {}),
+    }
+    _write_atomic(os.path.join(vdir, "model.pkl"),
+                  pickle.dumps(bundle, protocol=pickle.HIGHEST_PROTOCOL))
+    _write_atomic(os.path.join(vdir, "meta.json"), json.dumps(meta, indent=2), "w")
+    if activate:
+        set_current(version, root)
+    return meta
+
+
+def set_current(version, root=None):
+    """Atomically point CURRENT at an existing ``version``."""
+    root = root or ARTIFACT_DIR
+    if not os.path.exists(os.path.join(root, version, "meta.json")):
+        raise FileNotFoundError(f"No artifact version {version!r} in {root}")
+    _write_atomic(os.path.join(root, "CURRENT"), version, "w")
+
+
+def current_version(root=None):
+    try:
+        with open(os.path.join(root or ARTIFACT_DIR, "CURRENT")) as fh:
+            return fh.read().strip() or None
+    except OSError:
+        return None
+
+
+def read_meta(version, root=None):
+    with open(os.path.join(root or ARTIFACT_DIR, version, "meta.json")) as fh:
+        return json.load(fh)
+
+
+def load(version=None, expected_hash=None, source=None, params=None, root=None):
+    """Return ``(bundle, meta)`` for a compatible artifact, else ``None``.
+
+    An artifact is rejected when it was written by other library versions,
+    a different schema or data source, or (if given) other training data or
+    training parameters.
+    """
+    root = root or ARTIFACT_DIR
+    version = version or current_version(root)
+    if not version:
+        return None
+    try:
+        meta = read_meta(version, root)
+    except (OSError, ValueError):
+        return None
+    if meta.get("schema") != SCHEMA or meta.get("libs") != library_versions():
+        return None
+    if source is not None and meta.get("source") != source:
+        return None
+    # Incremental updates chain data_hash; base_data_hash is the full retrain's.
+    if expected_hash is not None and \
+            meta.get("base_data_hash", meta.get("data_hash")) != expected_hash:
+        return None
+    if params is not None and meta.get("params") != params:
+        return None
+    try:
+        with open(os.path.join(root, version, "model.pkl"), "rb") as fh:
+            bundle = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    return bundle, meta
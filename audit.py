@@ -0,0 +1,466 @@
+"""Append-only audit log of every risk assessment, written in the background.
+
+Each prediction is recorded with its timestamp, source (``app`` / ``server`` /
+``batch``),
+model version, the 8 inputs, the probability and the verdict.  ``record()``
+only appends a tuple to an in-memory buffer under a lock, so the caller never
+waits on disk.  A daemon writer thread flushes the buffer to SQLite in WAL
+mode, one transaction per batch, whenever ``BATCH_SIZE`` records are waiting
+or ``FLUSH_INTERVAL`` seconds have passed.
+
+The buffer is bounded by ``MAX_QUEUE`` records, counting those of a failed
+write that are waiting to be retried.  If the disk stalls or fails long
+enough to fill it, new records are dropped and counted (``stats()``,
+``diabetes_events_total{event="audit_dropped"}``) rather than blocking the
+caller.  A write that fails with ``sqlite3.OperationalError`` or ``OSError``
+(locked, disk full, I/O) is retried with the next batch.  Rows with a
+non-finite input or probability are refused before they are queued; any
+other database error makes the writer insert the batch row by row and drop
+the rows the database rejects, so one bad row cannot stall the log.  Both
+are logged and counted (``invalid``, ``event="audit_invalid"``).
+``close()`` (also run at interpreter exit) drains the buffer.  Triggers reject ``UPDATE`` and
+``DELETE``, so the table is append-only.
+
+Cohort scoring (``record_bulk``) bypasses the buffer: each scored chunk is
+written as one segment file to the spool directory next to the database
+(``<db>.spool/``, at most ``MAX_SPOOL_MB``; beyond that rows are dropped and
+counted).  Segments are written to a temporary name and renamed, so this is
+safe from any number of processes, including ones that never start a writer.
+Every started writer on the database ingests the spool: it claims a segment
+by renaming it, inserts it in one transaction and deletes it, or renames it
+back if the write is to be retried.  Claims and temporary files left by a
+process that died are recovered.  ``close()`` drains the spool too; what is
+left (e.g. after a timeout) is ingested by the next writer.
+
+    log = AuditLog().start()
+    log.record(row, model_version, proba, verdict, source="app")
+    log.query(start, end)                  # list of dicts, oldest first
+    log.export("audit.csv", start, end)    # CSV, streamed
+"""
+import atexit
+import csv
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+import metrics
+from scorer import FEATURES
+
+AUDIT_DB = os.environ.get(
+    "DIABETES_AUDIT_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".audit", "audit.db"),
+)
+MAX_QUEUE = int(os.environ.get("DIABETES_AUDIT_MAX_QUEUE", "100000"))
+MAX_SPOOL_MB = float(os.environ.get("DIABETES_AUDIT_MAX_SPOOL_MB", "1024"))
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+
+COLUMNS = ["ts", "source", "model_version", *FEATURES, "probability", "verdict"]
+
+log = logging.getLogger("diabetes.audit")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    source TEXT NOT NULL,
+    model_version TEXT,
+    {", ".join(f'"{name}" REAL NOT NULL' for name in FEATURES)},
+    probability REAL NOT NULL,
+    verdict INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assessments_ts ON assessments (ts);
+CREATE TRIGGER IF NOT EXISTS assessments_no_update BEFORE UPDATE ON assessments
+BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS assessments_no_delete BEFORE DELETE ON assessments
+BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END;
+"""
+_QUOTED = ", ".join(f'"{name}"' for name in COLUMNS)
+_INSERT = f"INSERT INTO assessments ({_QUOTED}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def _epoch(value):
+    """Seconds since the epoch from a number, ``datetime`` or ISO 8601 string."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists, owned by someone else
+    return True
+
+
+class AuditLog:
+    def __init__(self, path=AUDIT_DB, max_queue=MAX_QUEUE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, max_spool_mb=MAX_SPOOL_MB):
+        self.path = path
+        self.spool_dir = f"{path}.spool"
+        self.max_spool_bytes = int(max_spool_mb * 2**20)
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.invalid = 0
+        self.batches = 0
+        self.last_error = None
+        self._pending = []
+        self._retry = []                # taken by the writer, not yet committed
+        self._accepted = 0
+        self._seq = itertools.count()
+        self._done = 0                  # accepted records written or rejected by the db
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flushed = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    # ── Writing ───────────────────────────────────────────────────────────────
+    def record(self, row, model_version, probability, verdict, source="app", ts=None):
+        """Queue one assessment; never blocks on I/O."""
+        entry = (time.time() if ts is None else ts, source, model_version,
+                 *map(float, row), float(probability), int(verdict))
+        if not np.isfinite(entry[3:-1]).all():
+            self._refuse(1)
+            return
+        with self._lock:
+            if len(self._pending) + len(self._retry) >= self.max_queue:
+                self.dropped += 1
+                full = True
+            else:
+                self._pending.append(entry)
+                self._accepted += 1
+                full = False
+            wake = len(self._pending) >= self.batch_size
+        if full:
+            metrics.inc("diabetes_events_total", event="audit_dropped")
+        elif wake:
+            self._wake.set()
+
+    def record_many(self, X, model_version, probabilities, verdicts, source="server"):
+        """Queue a scored batch (NumPy rows of ``X`` with their results)."""
+        now = time.time()
+        ok = np.isfinite(X).all(axis=1) & np.isfinite(probabilities)
+        if not ok.all():
+            self._refuse(int((~ok).sum()))
+            X, probabilities, verdicts = X[ok], probabilities[ok], verdicts[ok]
+        entries = [(now, source, model_version, *row, proba, verdict)
+                   for row, proba, verdict in zip(X.tolist(), probabilities.tolist(),
+                                                  verdicts.tolist())]
+        with self._lock:
+            room = max(self.max_queue - len(self._pending) - len(self._retry), 0)
+            self._pending.extend(entries[:room])
+            self._accepted += min(room, len(entries))
+            dropped = len(entries) - room if len(entries) > room else 0
+            self.dropped += dropped
+            wake = len(self._pending) >= self.batch_size
+        if dropped:
+            metrics.inc("diabetes_events_total", dropped, event="audit_dropped")
+        if wake:
+            self._wake.set()
+
+    def record_bulk(self, X, model_version, probabilities, verdicts, source="batch"):
+        """``record_many`` for cohort scoring: writes one spool segment, never waits.
+
+        Works without ``start()``, e.g. in worker processes: a started log on
+        the same database writes the rows.
+        """
+        ok = np.isfinite(X).all(axis=1) & np.isfinite(probabilities)
+        if not ok.all():
+            self._refuse(int((~ok).sum()))
+        rows = np.empty((int(ok.sum()), len(COLUMNS) - 2))
+        if not len(rows):
+            return
+        rows[:, 0] = time.time()
+        rows[:, 1:-2] = X[ok]
+        rows[:, -2] = probabilities[ok]
+        rows[:, -1] = verdicts[ok]
+        meta = json.dumps({"source": source, "model_version": model_version})
+        try:
+            if self._spool_bytes() + rows.nbytes > self.max_spool_bytes:
+                raise OSError(f"spool is over {self.max_spool_bytes / 2**20:g} MB")
+            self._write_segment(rows, meta)
+        except OSError as exc:
+            with self._lock:
+                self.dropped += len(rows)
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            log.warning("Dropped %d audit records: %s", len(rows), exc)
+            metrics.inc("diabetes_events_total", len(rows), event="audit_dropped")
+            return
+        self._wake.set()
+
+    def _write_segment(self, rows, meta):
+        name = f"{time.time_ns():020d}-{os.getpid()}-{next(self._seq)}.npz"
+        tmp = os.path.join(self.spool_dir, f".{name}.tmp")
+        os.makedirs(self.spool_dir, exist_ok=True)
+        try:
+            with open(tmp, "wb") as fh:
+                np.savez(fh, rows=rows, meta=np.array(meta))
+            os.replace(tmp, os.path.join(self.spool_dir, name))
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _refuse(self, n):
+        with self._lock:
+            self.invalid += n
+        log.warning("Refused %d audit record(s) with non-finite values", n)
+        metrics.inc("diabetes_events_total", n, event="audit_invalid")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="audit-writer")
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def flush(self, timeout=10.0):
+        """Wait until everything queued or spooled so far is on disk.
+
+        Returns ``False`` on timeout.
+        """
+        with self._lock:
+            target = self._accepted
+        self._wake.set()
+        with self._flushed:
+            return self._flushed.wait_for(
+                lambda: self._done >= target and not self._segments(), timeout)
+
+    def close(self, timeout=10.0):
+        """Drain the buffer and the spool and stop the writer."""
+        if self._thread is None or self._stopped:
+            return
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            log.warning("Audit writer did not finish within %.0f s; %d records and "
+                        "%d spool segments pending", timeout,
+                        len(self._pending) + len(self._retry), len(self._segments()))
+
+    def _run(self):
+        conn = None
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                batch, self._pending = self._retry + self._pending, []
+                self._retry = batch
+            failed = False
+            try:
+                segments = self._reclaim()
+                if conn is None and (batch or segments):
+                    conn = self._connect()
+                if batch:
+                    rejected = self._insert(conn, batch)
+                    with self._lock:
+                        self._retry = []
+                    self._committed(len(batch), rejected, done=len(batch))
+                self._ingest(conn, segments)
+            except (sqlite3.OperationalError, OSError) as exc:
+                # The records stay in _retry, the segments in the spool, for
+                # the next wake-up.
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                log.warning("Audit write failed: %s", exc)
+                if conn is not None:
+                    conn.close()
+                conn = None
+                failed = True
+            if self._stopped:
+                with self._lock:
+                    drained = not self._pending
+                if failed:
+                    log.error("Audit log closing with %d unwritten records and %d spool "
+                              "segments", len(self._retry), len(self._segments()))
+                    break
+                if drained and not self._segments():
+                    break
+        if conn is not None:
+            conn.close()
+
+    def _committed(self, n, rejected, done=0):
+        with self._flushed:
+            self.written += n - rejected
+            self._done += done
+            self.batches += 1
+            self._flushed.notify_all()
+
+    # ── Spool ─────────────────────────────────────────────────────────────────
+    def _segments(self):
+        """Unclaimed spool segments, oldest first."""
+        try:
+            names = os.listdir(self.spool_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(n for n in names if n.endswith(".npz") and not n.startswith("."))
+
+    def _spool_bytes(self):
+        total = 0
+        try:
+            entries = list(os.scandir(self.spool_dir))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                pass  # ingested meanwhile
+        return total
+
+    def _reclaim(self):
+        """Recover claims and temporary files of dead processes; returns ``_segments()``."""
+        try:
+            names = os.listdir(self.spool_dir)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            path = os.path.join(self.spool_dir, name)
+            try:
+                if name.endswith(".claim"):       # <segment>.<pid>.claim
+                    segment, pid, _ = name.rsplit(".", 2)
+                    if not _alive(int(pid)):
+                        os.replace(path, os.path.join(self.spool_dir, segment))
+                elif name.endswith(".tmp"):       # .<ns>-<pid>-<seq>.npz.tmp
+                    if not _alive(int(name.split("-")[1])):
+                        os.remove(path)
+            except (ValueError, IndexError, FileNotFoundError):
+                continue
+        return self._segments()
+
+    def _ingest(self, conn, segments):
+        for name in segments:
+            path = os.path.join(self.spool_dir, name)
+            claim = f"{path}.{os.getpid()}.claim"
+            try:
+                os.replace(path, claim)
+            except FileNotFoundError:
+                continue  # another writer took it
+            try:
+                with np.load(claim) as segment:
+                    rows, meta = segment["rows"], json.loads(segment["meta"].item())
+            except (ValueError, KeyError, EOFError, zipfile.BadZipFile) as exc:
+                os.replace(claim, f"{path}.bad")
+                self.last_error = f"unreadable spool segment {name}: {exc}"
+                log.error("Set aside unreadable audit spool segment %s: %s", name, exc)
+                continue
+            except OSError:
+                os.replace(claim, path)
+                raise
+            source, version = meta["source"], meta["model_version"]
+            entries = [(r[0], source, version, *r[1:-1], int(r[-1])) for r in rows.tolist()]
+            try:
+                rejected = self._insert(conn, entries)
+            except BaseException:
+                os.replace(claim, path)
+                raise
+            os.remove(claim)
+            self._committed(len(entries), rejected)
+
+    def _insert(self, conn, entries):
+        """Commit ``entries`` in one transaction; returns how many were rejected.
+
+        ``OperationalError`` / ``OSError`` propagate to be retried.  After any
+        other database error the rows are inserted one by one instead, and
+        those the database refuses are logged and dropped.
+        """
+        try:
+            with conn:
+                conn.executemany(_INSERT, entries)
+            return 0
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.Error as exc:
+            log.warning("Audit batch of %d records rejected (%s); inserting row by row",
+                        len(entries), exc)
+        rejected = 0
+        with conn:
+            for entry in entries:
+                try:
+                    conn.execute(_INSERT, entry)
+                except sqlite3.OperationalError:
+                    raise
+                except sqlite3.Error as exc:
+                    rejected += 1
+                    log.warning("Dropped audit record %r: %s", entry, exc)
+        if rejected:
+            with self._lock:
+                self.invalid += rejected
+            metrics.inc("diabetes_events_total", rejected, event="audit_invalid")
+        return rejected
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    # ── Reading ───────────────────────────────────────────────────────────────
+    def stats(self):
+        with self._lock:
+            queued = len(self._pending) + len(self._retry)
+        return {"queued": queued, "spooled": len(self._segments()), "written": self.written,
+                "dropped": self.dropped, "invalid": self.invalid, "batches": self.batches,
+                "last_error": self.last_error}
+
+    def iter_records(self, start=None, end=None):
+        """Yield records with ``start <= ts < end`` as tuples in ``COLUMNS`` order."""
+        if not os.path.exists(self.path):
+            return
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=30)
+        try:
+            sql = f"SELECT {_QUOTED} FROM assessments"
+            clauses, params = [], []
+            if start is not None:
+                clauses.append("ts >= ?")
+                params.append(_epoch(start))
+            if end is not None:
+                clauses.append("ts < ?")
+                params.append(_epoch(end))
+            if clauses:
+                sql += " WHERE " + " AND ".join(clauses)
+            yield from conn.execute(sql + " ORDER BY ts, id", params)
+        finally:
+            conn.close()
+
+    def query(self, start=None, end=None):
+        """Records in ``[start, end)`` as dicts; bounds are epochs, datetimes or ISO strings."""
+        return [dict(zip(COLUMNS, r)) for r in self.iter_records(start, end)]
+
+    def export(self, out, start=None, end=None):
+        """Write records in ``[start, end)`` as CSV to a path or text file; returns the count."""
+        fh = open(out, "w", newline="") if isinstance(out, (str, os.PathLike)) else out
+        try:
+            writer = csv.writer(fh)
+            writer.writerow(["time"] + COLUMNS)
+            n = 0
+            for r in self.iter_records(start, end):
+                iso = datetime.fromtimestamp(r[0], timezone.utc).isoformat(timespec="milliseconds")
+                writer.writerow([iso, *r])
+                n += 1
+            return n
+        finally:
+            if fh is not out:
+                fh.close()
@@ -0,0 +1,134 @@
+"""Training backends for the linear diabetes classifier.
+
+``svc``     libsvm ``SVC(kernel="linear", probability=True)``; exact dual solver
+            with internal 5-fold Platt calibration.  Roughly quadratic in rows.
+``linear``  liblinear primal ``LinearSVC`` + one Platt fit on a held-out slice.
+``sgd``     ``SGDClassifier(loss="hinge")`` + the same Platt step.  Linear time
+            and the smallest memory footprint.
+``auto``    ``svc`` up to ``SVC_MAX_ROWS`` training rows, ``linear`` above.
+
+Every backend returns an estimator exposing ``coef_``, ``intercept_``,
+``classes_``, ``probA_`` / ``probB_`` and ``predict`` / ``predict_proba``, so
+``LinearScorer.from_model`` and the UI work unchanged.
+"""
+import time
+import warnings
+
+import numpy as np
+
+BACKENDS = ("auto", "svc", "linear", "sgd")
+SVC_MAX_ROWS = 5_000
+# Rows held out from the training split to fit the Platt sigmoid.
+CALIBRATION_FRACTION = 0.1
+CALIBRATION_MAX_ROWS = 200_000
+
+
+def resolve(backend, n_rows):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown training backend {backend!r}; choose from {BACKENDS}")
+    if backend == "auto":
+        return "svc" if n_rows <= SVC_MAX_ROWS else "linear"
+    return backend
+
+
+def fit_platt(margin, y):
+    """Fit ``P(y=1) = 1 / (1 + exp(A * margin - B))`` (sklearn's SVC convention).
+
+    Uses Platt's smoothed targets so a perfectly separable calibration slice
+    does not drive the slope to infinity.
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    y = np.asarray(y)
+    n_pos = int((y == 1).sum())
+    n_neg = len(y) - n_pos
+    hi, lo = (n_pos + 1.0) / (n_pos + 2.0), 1.0 / (n_neg + 2.0)
+    # Smoothed targets as two weighted copies of every sample.
+    target = np.where(y == 1, hi, lo)
+    X = np.concatenate([margin, margin]).reshape(-1, 1)
+    Y = np.concatenate([np.ones(len(y)), np.zeros(len(y))])
+    W = np.concatenate([target, 1.0 - target])
+    lr = LogisticRegression(C=1e6)
+    lr.fit(X, Y, sample_weight=W)
+    return -float(lr.coef_[0, 0]), float(lr.intercept_[0])
+
+
+class CalibratedLinearModel:
+    """A fitted linear estimator plus a separately fitted Platt sigmoid."""
+
+    def __init__(self, estimator, platt_a, platt_b):
+        self.estimator = estimator
+        self.coef_ = np.asarray(estimator.coef_, dtype=np.float64).reshape(1, -1)
+        self.intercept_ = np.asarray(estimator.intercept_, dtype=np.float64).ravel()
+        self.classes_ = estimator.classes_
+        self.probA_ = np.array([platt_a])
+        self.probB_ = np.array([platt_b])
+
+    @classmethod
+    def from_weights(cls, coef, intercept, classes, platt_a, platt_b):
+        """Build a model directly from weights, e.g. after an incremental update."""
+        from types import SimpleNamespace
+        return cls(SimpleNamespace(coef_=coef, intercept_=intercept, classes_=classes),
+                   platt_a, platt_b)
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_[0] + self.intercept_[0]
+
+    def predict_proba(self, X):
+        t = self.probB_[0] - self.probA_[0] * self.decision_function(X)
+        p = 0.5 * (1.0 + np.tanh(0.5 * t))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        # Thresholding the probability keeps label and risk consistent.
+        return self.classes_[(self.predict_proba(X)[:, 1] >= 0.5).astype(np.intp)]
+
+
+def fit(backend, x_train, y_train, random_state=2, timings=None, C=None,
+        class_weight=None, calibrate=True):
+    """Fit ``backend`` on scaled training data and return a calibrated classifier.
+
+    ``C`` (inverse regularisation strength, ``alpha = 1 / (C * n)`` for
+    ``sgd``) and ``class_weight`` default to each estimator's own defaults.
+    If ``timings`` is a dict, ``fit`` and ``calibrate`` seconds are stored in
+    it (libsvm calibrates inside ``fit``, so ``svc`` reports only ``fit``).
+    ``calibrate=False`` is for models that only ``predict``, e.g. CV folds:
+    ``svc`` then skips libsvm's internal five-fold Platt fit, which does not
+    change its labels.  The other backends label by their calibrated
+    probability, so they always calibrate.
+    """
+    from sklearn import svm
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.model_selection import train_test_split
+
+    timings = timings if timings is not None else {}
+    backend = resolve(backend, len(x_train))
+    start = time.perf_counter()
+    if backend == "svc":
+        classifier = svm.SVC(kernel="linear", probability=calibrate, C=C or 1.0,
+                             class_weight=class_weight, random_state=random_state)
+        with warnings.catch_warnings():
+            # probability=True is deprecated in sklearn 1.9; the other
+            # backends already calibrate separately.
+            warnings.simplefilter("ignore", FutureWarning)
+            classifier.fit(x_train, y_train)
+        timings["fit"] = time.perf_counter() - start
+        return classifier
+
+    n_cal = int(min(len(x_train) * CALIBRATION_FRACTION, CALIBRATION_MAX_ROWS))
+    x_fit, x_cal, y_fit, y_cal = train_test_split(
+        x_train, y_train, test_size=n_cal, stratify=y_train, random_state=random_state)
+    if backend == "linear":
+        estimator = svm.LinearSVC(dual="auto", C=C or 1.0, class_weight=class_weight,
+                                  random_state=random_state)
+    else:
+        alpha = 1.0 / (C * len(x_fit)) if C else 1e-4
+        estimator = SGDClassifier(loss="hinge", alpha=alpha, max_iter=20, tol=1e-4,
+                                  class_weight=class_weight, random_state=random_state)
+    estimator.fit(x_fit, y_fit)
+    timings["fit"] = time.perf_counter() - start
+    start = time.perf_counter()
+    margin = x_cal @ estimator.coef_[0] + estimator.intercept_[0]
+    platt_a, platt_b = fit_platt(margin, y_cal)
+    timings["calibrate"] = time.perf_counter() - start
+    return CalibratedLinearModel(estimator, platt_a, platt_b)
@@ -0,0 +1,207 @@
+"""Chunked cohort scoring for CSV / Parquet files.
+
+Input is streamed in fixed-size chunks through a compiled ``LinearScorer`` and
+results are appended to the output file as they are produced, so memory stays
+bounded by the chunk size regardless of cohort size.  Rows that cannot be
+scored go to a side file instead of aborting the run.
+"""
+import os
+import re
+import time
+import warnings
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from scorer import FEATURES
+
+DEFAULT_CHUNKSIZE = 50_000
+REJECT_COLUMNS = ["line", "row", "error"]
+
+BatchStats = namedtuple("BatchStats", ["rows", "rejected", "seconds"])
+_BAD_LINE = re.compile(r"Skipping line (\d+): (.*)")
+
+
+def detect_format(name):
+    ext = os.path.splitext(str(name).lower())[1]
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".csv", ".txt", ""):
+        return "csv"
+    raise ValueError(f"Unsupported cohort file type: {ext}")
+
+
+def _require_pyarrow(what):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(f"{what} requires pyarrow (pip install pyarrow)") from exc
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# ── Readers ───────────────────────────────────────────────────────────────────
+# Each reader yields ``(chunk, fraction_done)``.
+def _size(fh):
+    pos = fh.tell()
+    size = fh.seek(0, os.SEEK_END)
+    fh.seek(pos)
+    return size or 1
+
+
+def _iter_csv(source, chunksize, bad_lines):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            yield from _iter_csv(fh, chunksize, bad_lines)
+        return
+    size = _size(source)
+    # Pass-through columns are kept as text so every chunk has the same schema
+    # and identifiers round-trip unchanged; features keep the fast numeric path.
+    header = pd.read_csv(source, nrows=0).columns
+    source.seek(0)
+    dtype = {c: str for c in header if c not in FEATURES}
+    with pd.read_csv(source, chunksize=chunksize, dtype=dtype,
+                     on_bad_lines="warn") as reader:
+        while True:
+            # Ragged rows are dropped by the C parser; recover them from its
+            # warnings so they still land in the rejects file.
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always", pd.errors.ParserWarning)
+                chunk = next(reader, None)
+            for w in caught:
+                for line in str(w.message).splitlines():
+                    m = _BAD_LINE.match(line)
+                    if m:
+                        bad_lines.append({"line": int(m.group(1)), "error": m.group(2)})
+            if chunk is None:
+                return
+            yield chunk, min(source.tell() / size, 1.0)
+
+
+def _iter_parquet(source, chunksize):
+    _require_pyarrow("Parquet cohorts")
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(source)
+    total = pf.metadata.num_rows or 1
+    offset = 0
+    for batch in pf.iter_batches(batch_size=chunksize):
+        chunk = batch.to_pandas()
+        chunk.index += offset
+        offset += len(chunk)
+        yield chunk, offset / total
+
+
+def iter_chunks(source, fmt="csv", chunksize=DEFAULT_CHUNKSIZE, bad_lines=None):
+    if fmt == "parquet":
+        return _iter_parquet(source, chunksize)
+    return _iter_csv(source, chunksize, bad_lines if bad_lines is not None else [])
+
+
+# ── Writers ───────────────────────────────────────────────────────────────────
+class ChunkWriter:
+    """Appends DataFrames to a CSV or Parquet file, creating it on first write.
+
+    pyarrow's writers are used when installed (CSV serialisation is several
+    times faster than ``DataFrame.to_csv``); the schema is fixed by the first
+    chunk and later chunks are cast to it.
+    """
+
+    def __init__(self, path, fmt=None, use_arrow=None):
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        if self.fmt == "parquet":
+            _require_pyarrow("Parquet output")
+            use_arrow = True
+        self.use_arrow = _has_pyarrow() if use_arrow is None else use_arrow
+        self._writer = None
+        self._schema = None
+        self._started = False
+
+    def write(self, frame):
+        if self.use_arrow:
+            import pyarrow as pa
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.fmt == "parquet":
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self.path, table.schema)
+                else:
+                    import pyarrow.csv as pacsv
+                    self._writer = pacsv.CSVWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._schema))
+        else:
+            frame.to_csv(self.path, mode="a" if self._started else "w",
+                         header=not self._started, index=False)
+        self._started = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+# ── Scoring ───────────────────────────────────────────────────────────────────
+def score_stream(source, scorer, out_path, rejects_path, fmt=None,
+                 chunksize=DEFAULT_CHUNKSIZE, progress=None, monitor=None, audit=None,
+                 model_version=None):
+    """Score ``source`` chunk by chunk, writing results and rejects as it goes.
+
+    ``progress(rows_done, rejected, elapsed_seconds, fraction_done)`` is
+    called after every chunk.  Valid rows are also fed to ``monitor`` (a
+    ``drift.DriftMonitor``) and recorded in ``audit`` (an ``audit.AuditLog``,
+    as ``model_version``) if given.  Returns ``BatchStats``.
+    """
+    fmt = fmt or detect_format(getattr(source, "name", source))
+    writer = ChunkWriter(out_path)
+    rejects = ChunkWriter(rejects_path, "csv", use_arrow=False)
+    reject_cols = None
+    bad_lines = []
+    rows = rejected = 0
+    start = time.perf_counter()
+    try:
+        for chunk, fraction in iter_chunks(source, fmt, chunksize, bad_lines):
+            missing = [c for c in FEATURES if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"Cohort file is missing columns: {', '.join(missing)}")
+            if reject_cols is None:
+                reject_cols = REJECT_COLUMNS + list(chunk.columns)
+            X = chunk[FEATURES].apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
+            ok = np.isfinite(X).all(axis=1)
+
+            bad = [pd.DataFrame(bad_lines)] if bad_lines else []
+            if not ok.all():
+                bad.append(chunk.loc[~ok].assign(
+                    row=chunk.index[~ok], error="non-numeric or missing feature"))
+            if bad:
+                frame = pd.concat(bad, ignore_index=True).reindex(columns=reject_cols)
+                frame[["line", "row"]] = frame[["line", "row"]].astype("Int64")
+                rejects.write(frame)
+                rejected += len(frame)
+                bad_lines.clear()
+
+            if ok.any():
+                good = chunk.loc[ok].copy()
+                good[FEATURES] = X[ok]
+                label, proba, _ = scorer.score(X[ok])
+                if monitor is not None:
+                    monitor.update(X[ok])
+                if audit is not None:
+                    audit.record_bulk(X[ok], model_version, proba, label)
+                good["prediction"] = label
+                good["probability"] = proba
+                writer.write(good)
+                rows += len(good)
+            if progress is not None:
+                progress(rows, rejected, time.perf_counter() - start, fraction)
+    finally:
+        writer.close()
+        rejects.close()
+    return BatchStats(rows, rejected, time.perf_counter() - start)
@@ -0,0 +1,30 @@
+"""Shared helpers for the benchmark scripts (seeded, offline data)."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def seeded_cohort(n, seed=0):
+    """``(X, y)`` from the Pima-like generator in ``synthetic.py``."""
+    import synthetic
+    X, y = synthetic.generate(n, seed)
+    return X, y.astype(int)
+
+
+def seeded_frame(n, seed=0):
+    import pandas as pd
+    from scorer import FEATURES
+    X, y = seeded_cohort(n, seed)
+    data = pd.DataFrame(X, columns=FEATURES)
+    data["Outcome"] = y
+    return data
+
+
+def peak_rss_mb():
+    import resource
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
@@ -0,0 +1,70 @@
+"""Cost and sensitivity of the streaming drift monitor (``drift.py``).
+
+    python benchmarks/drift_overhead.py
+
+Times the fused scorer with and without a ``DriftMonitor.update`` on the same
+input, for single rows (the app and unbatched server) and for micro-batches
+(the batched server), then feeds an in-distribution cohort and a shifted one
+(higher glucose and BMI) and prints the per-feature PSI / KS each produces.
+The monitor's state is the same size however many rows it has seen.
+"""
+import sys
+import timeit
+import warnings
+
+from sklearn.preprocessing import StandardScaler
+
+from common import seeded_cohort  # puts the project root on sys.path
+
+import backends  # noqa: E402
+import drift  # noqa: E402
+from scorer import FEATURES, LinearScorer  # noqa: E402
+
+warnings.simplefilter("ignore")
+
+
+def _per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main():
+    X, y = seeded_cohort(768)
+    scaler = StandardScaler().fit(X)
+    scorer = LinearScorer.from_model(backends.fit("linear", scaler.transform(X), y), scaler)
+    monitor = drift.DriftMonitor(drift.profile(X))
+
+    X_live, _ = seeded_cohort(50_000, seed=1)
+    row = X_live[0]
+    print(f"{'call':<22} {'score µs':>10} {'+ update µs':>12} {'overhead':>9}")
+    for name, X_call, number in (("single row", row, 20_000),
+                                 ("batch of 64", X_live[:64], 2_000),
+                                 ("batch of 4096", X_live[:4096], 100)):
+        base = _per_call(lambda: scorer.score(X_call), number)
+        both = _per_call(lambda: (scorer.score(X_call), monitor.update(X_call)), number)
+        print(f"{name:<22} {base * 1e6:10.2f} {both * 1e6:12.2f} {(both - base) * 1e6:8.2f}µs")
+
+    cohorts = {"in-distribution": X_live}
+    shifted = X_live.copy()
+    shifted[:, FEATURES.index("Glucose")] += 25
+    shifted[:, FEATURES.index("BMI")] *= 1.15
+    cohorts["glucose +25, BMI x1.15"] = shifted
+    ok = True
+    for name, cohort in cohorts.items():
+        monitor.reset()
+        for start in range(0, len(cohort), 64):
+            monitor.update(cohort[start:start + 64])
+        report = monitor.report()
+        print(f"\n{name}: {report['count']:,} rows, drifted: {report['drifted'] or 'none'}")
+        for f in report["features"]:
+            print(f"  {f['feature']:<26} psi {f['psi']:6.3f}  ks {f['ks']:5.3f}  "
+                  f"shift {f['shift']:+6.2f} sd")
+        expected = [] if name == "in-distribution" else ["Glucose", "BMI"]
+        ok &= report["drifted"] == expected
+    state = len(monitor._counts) + len(monitor._sum) + len(monitor._sumsq)
+    print(f"\nmonitor state: {state} numbers, independent of rows seen")
+    print("DRIFT CHECK OK" if ok else "DRIFT CHECK FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
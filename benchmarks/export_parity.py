@@ -0,0 +1,106 @@
+"""Exactness and footprint check for the JSON export and ``tiny_scorer``.
+
+    python benchmarks/export_parity.py
+
+For each training backend the model is exported, reloaded with
+``TinyScorer`` and compared with ``classifier.predict_proba`` on
+``scaler.transform``-ed data, row by row (pure Python) and as a batch (NumPy).
+Exits non-zero on any mismatch.  Also reports single-row latency and the
+import time / peak RSS of a process that only loads the exported file.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+import warnings
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from common import ROOT, seeded_cohort  # puts the project root on sys.path
+
+import backends  # noqa: E402
+import model_export  # noqa: E402
+from tiny_scorer import TinyScorer  # noqa: E402
+
+warnings.simplefilter("ignore")
+
+# The calibrated linear backends apply the sigmoid in closed form, so the
+# export must match them to rounding.  libsvm couples its Platt estimate
+# iteratively, so SVC.predict_proba is only within about 5e-3 of the
+# closed-form sigmoid (see scorer_parity.py).
+EXACT_ATOL = 1e-12
+SVC_PROBA_ATOL = 1e-2
+
+# ru_maxrss survives fork + exec on Linux, so read the new process's own
+# high-water mark from /proc when available.
+_FOOTPRINT = """
+import sys, time
+start = time.perf_counter()
+from tiny_scorer import TinyScorer
+scorer = TinyScorer.load(sys.argv[1])
+scorer.score_one([1, 120, 70, 23, 80, 32.0, 0.47, 33])
+elapsed = time.perf_counter() - start
+try:
+    with open("/proc/self/status") as fh:
+        rss = next(int(l.split()[1]) for l in fh if l.startswith("VmHWM")) / 1024
+except OSError:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**20
+print(elapsed, rss, "numpy" in sys.modules, "sklearn" in sys.modules)
+"""
+
+
+def check(backend, X, y, X_eval, workdir):
+    scaler = StandardScaler().fit(X)
+    classifier = backends.fit(backend, scaler.transform(X), y, random_state=0)
+    path = os.path.join(workdir, f"{backend}.json")
+    model_export.export(classifier, scaler, path, model_version=backend)
+    tiny = TinyScorer.load(path)
+
+    scaled = scaler.transform(X_eval)
+    ref_margin = classifier.decision_function(scaled)
+    ref_proba = classifier.predict_proba(scaled)[:, 1]
+    label, proba, margin = tiny.score(X_eval)
+    rows = [tiny.score_one(r) for r in X_eval[:2000].tolist()]
+    row_proba = np.array([p for _, p, _ in rows])
+    row_label = np.array([lab for lab, _, _ in rows])
+
+    atol = SVC_PROBA_ATOL if backend == "svc" else EXACT_ATOL
+    margin_err = float(np.abs(margin - ref_margin).max())
+    proba_err = float(np.abs(proba - ref_proba).max())
+    row_err = float(np.abs(row_proba - proba[:2000]).max())
+    label_ok = bool((row_label == label[:2000]).all())
+    ok = margin_err < 1e-9 and proba_err < atol and row_err < EXACT_ATOL and label_ok
+    print(f"{backend:>7}: |margin| {margin_err:.1e}  |proba - predict_proba| {proba_err:.1e} "
+          f"(tol {atol:.0e})  |row - batch| {row_err:.1e}  labels {'ok' if label_ok else 'DIFF'}  "
+          f"{os.path.getsize(path)} bytes")
+    return ok, tiny, path
+
+
+def main():
+    X, y = seeded_cohort(768)
+    X_eval, _ = seeded_cohort(20_000, seed=1)
+    workdir = tempfile.mkdtemp(prefix="diabetes-export-")
+    results = [check(b, X, y, X_eval, workdir) for b in ("svc", "linear", "sgd")]
+    ok = all(r[0] for r in results)
+
+    _, tiny, path = results[1]
+    row = X_eval[0].tolist()
+    n = 20_000
+    one = timeit.timeit(lambda: tiny.score_one(row), number=n) / n
+    batch = timeit.timeit(lambda: tiny.score(X_eval), number=20) / 20
+    print(f"single row {one * 1e6:.2f} µs (pure Python)   "
+          f"{len(X_eval):,} rows {batch * 1e3:.2f} ms (NumPy)")
+
+    out = subprocess.run([sys.executable, "-c", _FOOTPRINT, path], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout.split()
+    print(f"fresh process: import + load + first score {float(out[0]) * 1000:.1f} ms, "
+          f"peak RSS {float(out[1]):.1f} MB, numpy imported: {out[2]}, sklearn imported: {out[3]}")
+    print("EXPORT PARITY OK" if ok else "EXPORT PARITY FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""Load generator for server.py: micro-batched vs. per-request scoring.
+
+    python benchmarks/loadgen.py --requests 20000 --concurrency 64
+
+Starts the server twice in a subprocess (``--max-batch 1`` and the batched
+setting), drives it with keep-alive clients and prints throughput and
+client-side p50 / p99 latency for each.  The servers run offline on a seeded
+cohort with their own data, artifact and audit directories, like
+``ui_rerun.py``.  ``--url`` targets a running server instead.
+
+On one CPU core the batched server measured 0.92-1.05x the per-request
+throughput with 1 client (the same code path, within noise), 0.96-1.19x with
+4 and 1.03-1.40x with 16-64.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from common import ROOT, seeded_frame  # puts the project root on sys.path
+
+
+def _request(method, path, body=b""):
+    return (f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+
+
+async def _read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode().partition(":")
+        if key.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def _client(host, port, bodies, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            writer.write(_request("POST", "/score", body))
+            await writer.drain()
+            status, _ = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def _get(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(_request("GET", path))
+    await writer.drain()
+    _, body = await _read_response(reader)
+    writer.close()
+    return json.loads(body)
+
+
+async def run_load(host, port, n_requests, concurrency, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = np.column_stack([
+        rng.integers(0, 17, n_requests), rng.integers(50, 250, n_requests),
+        rng.integers(20, 140, n_requests), rng.integers(0, 100, n_requests),
+        rng.integers(0, 850, n_requests), rng.uniform(10, 70, n_requests).round(1),
+        rng.uniform(0.05, 2.5, n_requests).round(3), rng.integers(21, 90, n_requests),
+    ])
+    bodies = [json.dumps({"features": r.tolist()}).encode() for r in rows]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, bodies[i::concurrency], latencies, errors)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    lat = np.array(latencies) * 1000
+    server_stats = await _get(host, port, "/stats")
+    return {
+        "requests": n_requests,
+        "errors": len(errors),
+        "seconds": elapsed,
+        "rps": n_requests / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "mean_batch_size": server_stats["mean_batch_size"],
+    }
+
+
+def _isolated_env():
+    """Offline environment with its own data, artifacts and audit log, as ui_rerun.py."""
+    import dataset
+
+    workdir = tempfile.mkdtemp(prefix="diabetes-loadgen-")
+    env = dict(os.environ, DIABETES_DATA_DIR=os.path.join(workdir, "data"),
+               DIABETES_ARTIFACT_DIR=os.path.join(workdir, "artifacts"),
+               DIABETES_AUDIT_DB=os.path.join(workdir, "audit.db"), DIABETES_OFFLINE="1")
+    dataset.write_cache(seeded_frame(768), root=env["DIABETES_DATA_DIR"])
+    return env
+
+
+def _spawn(port, max_batch, max_wait_ms, env):
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "server.py"), "--port", str(port),
+         "--max-batch", str(max_batch), "--max-wait-ms", str(max_wait_ms)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            asyncio.run(_get("127.0.0.1", port, "/health"))
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not become healthy")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="existing server, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        modes = [("target", url.hostname, url.port, None)]
+    else:
+        modes = [("per-request", "127.0.0.1", args.port, 1),
+                 ("micro-batched", "127.0.0.1", args.port + 1, args.max_batch)]
+
+    env = None if args.url else _isolated_env()
+    results = {}
+    for name, host, port, max_batch in modes:
+        proc = _spawn(port, max_batch, args.max_wait_ms, env) if max_batch else None
+        try:
+            results[name] = asyncio.run(run_load(host, port, args.requests, args.concurrency))
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+        r = results[name]
+        print(f"{name:>14}: {r['rps']:8,.0f} req/s   p50 {r['p50_ms']:6.2f} ms   "
+              f"p99 {r['p99_ms']:6.2f} ms   mean batch {r['mean_batch_size'] or 0:5.1f}   "
+              f"errors {r['errors']}")
+    if len(results) == 2:
+        gain = results["micro-batched"]["rps"] / results["per-request"]["rps"]
+        print(f"throughput gain: {gain:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
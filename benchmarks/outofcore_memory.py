@@ -0,0 +1,84 @@
+"""Peak memory of in-memory vs. out-of-core training on the same cohort.
+
+    python benchmarks/outofcore_memory.py --rows 1000000 5000000
+
+For each row count a seeded float32 ``.npy`` store is written with
+``synthetic.write``.  Two fresh processes then train on it:
+
+``in-memory``    what ``diabetes_core.load`` does with a large dataset: the
+                 rows as a float64 DataFrame, then ``diabetes_core.train``
+                 (``sgd`` backend, the cheapest in-memory one);
+``out-of-core``  ``outofcore.train`` on the memory-mapped store.
+
+Peak RSS is the process high-water mark (``VmHWM``) minus its value after
+imports, so library code is not counted.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+from common import ROOT  # puts the project root on sys.path
+
+
+def _rss_mb(field="VmHWM"):
+    try:
+        with open("/proc/self/status") as fh:
+            return next(int(l.split()[1]) for l in fh if l.startswith(field)) / 1024
+    except (OSError, StopIteration):
+        from common import peak_rss_mb
+        return peak_rss_mb()
+
+
+def _worker(mode, path):
+    warnings.simplefilter("ignore")
+    import numpy as np
+    import pandas as pd
+    import sklearn.linear_model, sklearn.model_selection, sklearn.preprocessing  # noqa: F401,E401
+
+    import diabetes_core
+    import outofcore
+    from dataset import COLUMNS
+    baseline = _rss_mb()
+    start = time.perf_counter()
+    if mode == "in-memory":
+        data = pd.DataFrame(np.load(path).astype(np.float64), columns=COLUMNS)
+        _, _, train_acc, test_acc = diabetes_core.train(data, "sgd")
+    else:
+        _, _, train_acc, test_acc = outofcore.train(path)
+    seconds = time.perf_counter() - start
+    print(json.dumps({"mode": mode, "seconds": seconds, "peak_mb": _rss_mb() - baseline,
+                      "test_acc": test_acc}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--worker", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        _worker(*args.worker)
+        return
+
+    import synthetic
+    workdir = tempfile.mkdtemp(prefix="diabetes-ooc-")
+    print(f"{'rows':>10} {'store MB':>9} {'mode':>12} {'seconds':>8} {'peak MB':>8} {'test acc':>9}")
+    for rows in args.rows:
+        path = os.path.join(workdir, f"cohort-{rows}.npy")
+        synthetic.write(path, rows, seed=0)
+        size = os.path.getsize(path) / 2**20
+        for mode in ("in-memory", "out-of-core"):
+            out = subprocess.run([sys.executable, __file__, "--worker", mode, path], cwd=ROOT,
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{rows:>10,} {size:9.1f} {mode:>12} {r['seconds']:8.1f} {r['peak_mb']:8.1f} "
+                  f"{r['test_acc']:9.4f}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Reproducible offline benchmark suite.
+
+    python benchmarks/run.py                      # writes benchmarks/results/<commit>.json
+    python benchmarks/run.py --quick              # smaller batch sizes
+    python benchmarks/run.py --compare old.json new.json
+
+Measures, against a seeded local dataset (no network access):
+
+* cold start: ``diabetes_core.load()`` when training vs. loading the artifact,
+  and training broken down by phase (fetch, scale, fit, calibrate, evaluate);
+* single-row latency through ``scaler.transform`` → ``predict`` →
+  ``predict_proba`` and through the fused ``LinearScorer``;
+* batch throughput from 1e3 to 1e6 rows;
+* file scoring: a seeded ``synthetic.py`` cohort (1e6 rows by default) is
+  written to Parquet chunk by chunk and streamed through ``batch.score_stream``;
+* peak RSS after each section and the tracemalloc peak of batch scoring.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import timeit
+import tracemalloc
+import warnings
+
+import numpy as np
+
+from common import ROOT, peak_rss_mb, seeded_cohort, seeded_frame
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _percentiles(samples):
+    arr = np.asarray(samples) * 1e6
+    return {"p50_us": float(np.percentile(arr, 50)), "p99_us": float(np.percentile(arr, 99)),
+            "mean_us": float(arr.mean())}
+
+
+def _time_calls(fn, n):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# ── Sections ──────────────────────────────────────────────────────────────────
+def bench_cold_start(workdir, rows):
+    import dataset
+    import diabetes_core
+
+    # Seed a local "remote" CSV so the fetch phase is exercised offline.
+    csv_path = os.path.join(workdir, "pima.csv")
+    seeded_frame(rows).to_csv(csv_path, header=False, index=False)
+
+    start = time.perf_counter()
+    data = dataset.fetch(csv_path)
+    fetch_s = time.perf_counter() - start
+    dataset.write_cache(data, url=diabetes_core.DATA_URL)
+    start = time.perf_counter()
+    data, source = dataset.load()
+    cache_s = time.perf_counter() - start
+    assert source == "cache", source
+
+    phases = {}
+    diabetes_core.train(data, timings=phases)
+    phases = {"fetch_remote": fetch_s, "fetch_cache": cache_s, **phases}
+
+    start = time.perf_counter()
+    *_, info = diabetes_core.load()
+    trained_s = time.perf_counter() - start
+    assert info["path"] == "trained", info
+    start = time.perf_counter()
+    *_, info = diabetes_core.load()
+    artifact_s = time.perf_counter() - start
+    assert info["path"] == "artifact", info
+    return {"rows": rows, "phases_s": phases,
+            "load_trained_s": trained_s, "load_artifact_s": artifact_s}
+
+
+def bench_single_row(n_calls):
+    import diabetes_core
+    from scorer import LinearScorer
+
+    classifier, scaler, *_ = diabetes_core.load()
+    scorer = LinearScorer.from_model(classifier, scaler)
+    row = np.array([[1, 120, 70, 23, 80, 32.0, 0.47, 33]], dtype=np.float64)
+
+    def sklearn_path():
+        scaled = scaler.transform(row)
+        classifier.predict(scaled)
+        classifier.predict_proba(scaled)
+
+    for fn in (sklearn_path, lambda: scorer.score_one(row)):
+        fn()  # warm up
+    return {"sklearn": _percentiles(_time_calls(sklearn_path, n_calls)),
+            "fused": _percentiles(_time_calls(lambda: scorer.score_one(row), n_calls))}
+
+
+def bench_batch(sizes, max_sklearn_rows):
+    import diabetes_core
+    from scorer import LinearScorer
+
+    classifier, scaler, *_ = diabetes_core.load()
+    scorer = LinearScorer.from_model(classifier, scaler)
+    out = []
+    for n in sizes:
+        X, _ = seeded_cohort(n, seed=1)
+        reps = max(1, int(2e6 // n))
+        tracemalloc.start()
+        fused = timeit.timeit(lambda: scorer.score(X), number=reps) / reps
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        entry = {"rows": n, "fused_rows_per_s": n / fused,
+                 "fused_traced_peak_mb": traced_peak / 2**20}
+        if n <= max_sklearn_rows:
+            def sklearn_path():
+                scaled = scaler.transform(X)
+                classifier.predict(scaled)
+                classifier.predict_proba(scaled)
+            sk = timeit.timeit(sklearn_path, number=1)
+            entry["sklearn_rows_per_s"] = n / sk
+        out.append(entry)
+    return out
+
+
+def bench_file(workdir, rows):
+    import batch
+    import diabetes_core
+    import synthetic
+    from scorer import LinearScorer
+
+    classifier, scaler, *_ = diabetes_core.load()
+    scorer = LinearScorer.from_model(classifier, scaler)
+    path = os.path.join(workdir, "cohort.parquet")
+    written = synthetic.write(path, rows, seed=1, chunksize=1 << 18)
+    stats = batch.score_stream(path, scorer, os.path.join(workdir, "scored.parquet"),
+                               os.path.join(workdir, "rejects.csv"))
+    assert stats.rows == rows, stats
+    return {"rows": rows, "generate_rows_per_s": rows / written["seconds"],
+            "file_mb": os.path.getsize(path) / 2**20,
+            "score_rows_per_s": rows / stats.seconds, "peak_rss_mb": peak_rss_mb()}
+
+
+# ── Reporting ─────────────────────────────────────────────────────────────────
+def _flatten(obj, prefix=""):
+    flat = {}
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            flat.update(_flatten(v, f"{prefix}{k}."))
+    elif isinstance(obj, list):
+        for item in obj:
+            key = item.get("rows", len(flat))
+            flat.update(_flatten({k: v for k, v in item.items() if k != "rows"},
+                                 f"{prefix}{key}."))
+    elif isinstance(obj, (int, float)) and not isinstance(obj, bool):
+        flat[prefix.rstrip(".")] = obj
+    return flat
+
+
+def compare(old_path, new_path):
+    with open(old_path) as fh:
+        old = _flatten(json.load(fh)["results"])
+    with open(new_path) as fh:
+        new = _flatten(json.load(fh)["results"])
+    print(f"{'metric':<52} {'old':>12} {'new':>12} {'change':>8}")
+    for key in sorted(old.keys() & new.keys()):
+        a, b = old[key], new[key]
+        change = (b - a) / a * 100 if a else float("nan")
+        print(f"{key:<52} {a:12.4g} {b:12.4g} {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--quick", action="store_true", help="batch sizes up to 1e5 only")
+    parser.add_argument("--rows", type=int, default=768, help="training rows")
+    parser.add_argument("--calls", type=int, default=2000, help="single-row samples")
+    parser.add_argument("--max-sklearn-rows", type=int, default=100_000)
+    parser.add_argument("--file-rows", type=int, default=None,
+                        help="rows in the file-scoring cohort (default 1e6, 1e5 with --quick; 0 skips)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    warnings.simplefilter("ignore")
+    workdir = tempfile.mkdtemp(prefix="diabetes-bench-")
+    # Isolate caches and forbid network access before the project modules
+    # read their configuration.
+    os.environ["DIABETES_DATA_DIR"] = os.path.join(workdir, "data")
+    os.environ["DIABETES_ARTIFACT_DIR"] = os.path.join(workdir, "artifacts")
+    os.environ["DIABETES_OFFLINE"] = "1"
+
+    sizes = [1_000, 10_000, 100_000] + ([] if args.quick else [1_000_000])
+    results = {}
+    results["cold_start"] = bench_cold_start(workdir, args.rows)
+    results["peak_rss_mb_after_cold_start"] = peak_rss_mb()
+    results["single_row"] = bench_single_row(args.calls)
+    results["batch"] = bench_batch(sizes, args.max_sklearn_rows)
+    file_rows = args.file_rows if args.file_rows is not None else (
+        100_000 if args.quick else 1_000_000)
+    if file_rows:
+        results["file"] = bench_file(workdir, file_rows)
+    results["peak_rss_mb"] = peak_rss_mb()
+
+    import numpy
+    import pandas
+    import sklearn
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "libs": {"numpy": numpy.__version__, "pandas": pandas.__version__,
+                 "sklearn": sklearn.__version__},
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as fh:
+        json.dump(report, fh, indent=2)
+
+    cs = results["cold_start"]
+    print("cold start phases (ms): " + ", ".join(
+        f"{k} {v * 1000:.1f}" for k, v in cs["phases_s"].items()))
+    print(f"load(): trained {cs['load_trained_s'] * 1000:.1f} ms, "
+          f"artifact {cs['load_artifact_s'] * 1000:.1f} ms")
+    sr = results["single_row"]
+    print(f"single row p50: sklearn {sr['sklearn']['p50_us']:.1f} µs, "
+          f"fused {sr['fused']['p50_us']:.1f} µs")
+    for b in results["batch"]:
+        sk = b.get("sklearn_rows_per_s")
+        print(f"batch {b['rows']:>9,}: fused {b['fused_rows_per_s']:14,.0f} rows/s"
+              + (f", sklearn {sk:12,.0f} rows/s" if sk else ""))
+    if "file" in results:
+        f = results["file"]
+        print(f"file {f['rows']:>10,}: generate {f['generate_rows_per_s']:,.0f} rows/s "
+              f"({f['file_mb']:.1f} MB Parquet), score {f['score_rows_per_s']:,.0f} rows/s")
+    print(f"peak RSS {results['peak_rss_mb']:.1f} MB -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Parity and latency check: LinearScorer vs. scaler.transform + predict + predict_proba.
+
+    python benchmarks/scorer_parity.py
+
+Exits non-zero if the fused scorer disagrees with sklearn beyond tolerance.
+"""
+import sys
+import timeit
+import warnings
+
+import numpy as np
+from sklearn import svm
+from sklearn.preprocessing import StandardScaler
+
+from common import seeded_cohort
+from scorer import LinearScorer
+
+warnings.simplefilter("ignore")
+
+# libsvm couples the pairwise Platt estimate iteratively (stops once the
+# optimality residual is below 0.005 / k), so its predict_proba is only an
+# approximation of the closed-form sigmoid.
+PROBA_ATOL = 5e-3
+
+
+def main():
+    X, y = seeded_cohort(768)
+    scaler = StandardScaler().fit(X)
+    classifier = svm.SVC(kernel="linear", probability=True, random_state=0).fit(scaler.transform(X), y)
+    scorer = LinearScorer.from_model(classifier, scaler)
+
+    X_eval, _ = seeded_cohort(20_000, seed=1)
+    scaled = scaler.transform(X_eval)
+    ref_margin = classifier.decision_function(scaled)
+    ref_proba = classifier.predict_proba(scaled)[:, 1]
+    ref_label = classifier.predict(scaled)
+    label, proba, margin = scorer.score(X_eval)
+
+    margin_err = np.abs(margin - ref_margin).max()
+    proba_err = np.abs(proba - ref_proba).max()
+    # Disagreements are only allowed where sklearn's own predict and
+    # predict_proba contradict each other, or within tolerance of 0.5.
+    sk_inconsistent = (ref_proba >= 0.5) != (ref_label == 1)
+    borderline = np.abs(proba - 0.5) < PROBA_ATOL
+    label_diff = (label != ref_label) & ~sk_inconsistent & ~borderline
+    print(f"max |margin - decision_function| : {margin_err:.2e}")
+    print(f"max |proba - predict_proba|      : {proba_err:.2e}")
+    print(f"sklearn predict/proba conflicts  : {int(sk_inconsistent.sum())} / {len(X_eval)}")
+    print(f"scorer label/proba conflicts     : {int(((proba >= 0.5) != (label == 1)).sum())}")
+    print(f"unexplained label differences    : {int(label_diff.sum())}")
+    ok = margin_err < 1e-9 and proba_err < PROBA_ATOL and not label_diff.any()
+
+    row = X_eval[:1]
+    n = 2000
+    sk = timeit.timeit(lambda: (classifier.predict(scaler.transform(row)),
+                                classifier.predict_proba(scaler.transform(row))),
+                       number=n) / n
+    fused = timeit.timeit(lambda: scorer.score(row), number=n) / n
+    print(f"single row  sklearn {sk * 1e6:9.1f} µs   fused {fused * 1e6:7.1f} µs   ({sk / fused:.0f}x)")
+    sk_b = timeit.timeit(lambda: (classifier.predict(scaler.transform(X_eval)),
+                                  classifier.predict_proba(scaler.transform(X_eval))),
+                         number=3) / 3
+    fused_b = timeit.timeit(lambda: scorer.score(X_eval), number=20) / 20
+    print(f"{len(X_eval)} rows  sklearn {sk_b * 1e3:9.2f} ms   fused {fused_b * 1e3:7.2f} ms   ({sk_b / fused_b:.0f}x)")
+
+    print("PARITY OK" if ok else "PARITY FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Fit time and peak memory vs. row count for each training backend.
+
+    python benchmarks/train_scaling.py --rows 1000 10000 100000 1000000 2000000
+
+Every (backend, rows) pair runs in a fresh subprocess so peak RSS is not
+polluted by earlier runs.  ``svc`` is skipped above ``--svc-max-rows`` because
+libsvm's dual solver is roughly quadratic in rows.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import warnings
+
+from common import peak_rss_mb, seeded_frame
+
+
+def _worker(backend, rows):
+    warnings.simplefilter("ignore")
+    import backends  # noqa: F401
+    import diabetes_core
+    # Pay the scikit-learn import cost before the timer starts.
+    import sklearn.linear_model, sklearn.model_selection, sklearn.svm  # noqa: F401,E401
+    data = seeded_frame(rows)
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    _, _, train_acc, test_acc = diabetes_core.train(data, backend)
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    print(json.dumps({"backend": backend, "rows": rows, "fit_seconds": seconds,
+                      "peak_rss_mb": peak, "fit_rss_delta_mb": max(0.0, peak - before),
+                      "train_acc": train_acc, "test_acc": test_acc}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+",
+                        default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--backends", nargs="+", default=["svc", "linear", "sgd"])
+    parser.add_argument("--svc-max-rows", type=int, default=20_000)
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "ROWS"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        _worker(args.worker[0], int(args.worker[1]))
+        return
+
+    results = []
+    print(f"{'backend':>8} {'rows':>10} {'fit s':>9} {'peak MB':>9} {'fit ΔMB':>9} {'test acc':>9}")
+    for rows in args.rows:
+        for backend in args.backends:
+            if backend == "svc" and rows > args.svc_max_rows:
+                print(f"{backend:>8} {rows:>10,} {'skipped':>9}")
+                continue
+            out = subprocess.run([sys.executable, __file__, "--worker", backend, str(rows)],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            results.append(r)
+            print(f"{backend:>8} {rows:>10,} {r['fit_seconds']:9.3f} {r['peak_rss_mb']:9.1f} "
+                  f"{r['fit_rss_delta_mb']:9.1f} {r['test_acc']:9.3f}")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
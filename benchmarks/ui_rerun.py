@@ -0,0 +1,121 @@
+"""Per-interaction cost of the Streamlit app, measured headlessly with AppTest.
+
+    python benchmarks/ui_rerun.py
+
+Runs ``diabetes.py`` against a seeded offline dataset, with its own artifact
+directory and audit log in a temporary directory, and drives a short
+session: first load, editing three patient metrics, pressing *Analyse* and
+switching the what-if feature.  For each step it reports the serialised size
+of every element the script emitted (what a rerun sends over the websocket),
+the share of that taken by markdown HTML, and the server CPU time spent.
+
+AppTest always executes the whole script, so the cost of a fragment-scoped
+rerun is taken from the ``scope="fragment"`` timer inside the app.  The
+session summary then counts what a browser triggers: a full rerun per widget
+edit without the form, versus nothing per edit and one fragment rerun per
+submit / what-if change with it.
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+from common import ROOT, seeded_frame
+
+
+def _elements(node):
+    proto = getattr(node, "proto", None)
+    if proto is not None and hasattr(proto, "ByteSize"):
+        yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _elements(child)
+
+
+def _fragment_seconds():
+    import metrics
+    for name, labels, _, total, *_ in metrics.snapshot():
+        if name == "diabetes_rerun_seconds" and labels == {"scope": "fragment"}:
+            return total
+    return 0.0
+
+
+def _measure(at, action):
+    frag = _fragment_seconds()
+    cpu, wall = time.process_time(), time.perf_counter()
+    action()
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    assert not at.exception, at.exception
+    elements = list(_elements(at._tree))
+    total = sum(e.proto.ByteSize() for e in elements)
+    markdown = sum(len(m.value.encode()) for m in at.markdown)
+    return {"bytes": total, "markdown_bytes": markdown, "elements": len(elements),
+            "cpu_ms": cpu * 1000, "wall_ms": wall * 1000,
+            "fragment_ms": (_fragment_seconds() - frag) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="sessions to average over")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    workdir = tempfile.mkdtemp(prefix="diabetes-ui-")
+    os.environ["DIABETES_DATA_DIR"] = os.path.join(workdir, "data")
+    os.environ["DIABETES_ARTIFACT_DIR"] = os.path.join(workdir, "artifacts")
+    os.environ["DIABETES_AUDIT_DB"] = os.path.join(workdir, "audit.db")
+    os.environ["DIABETES_OFFLINE"] = "1"
+    os.environ["DIABETES_METRICS"] = "1"
+    os.chdir(ROOT)  # picks up .streamlit/config.toml
+
+    import dataset
+    from streamlit.testing.v1 import AppTest
+
+    dataset.write_cache(seeded_frame(768))
+    script = os.path.join(ROOT, "diabetes.py")
+    AppTest.from_file(script, default_timeout=120).run()  # train + persist once
+
+    steps = {}
+    for _ in range(args.repeat):
+        at = AppTest.from_file(script, default_timeout=60)
+        # (step, action, browser rerun without the form, with form + fragment)
+        session = [
+            ("first load", at.run, "app", "app"),
+            ("edit glucose", lambda: at.number_input[1].set_value(160).run(), "app", None),
+            ("edit BMI", lambda: at.number_input[5].set_value(36.5).run(), "app", None),
+            ("edit age", lambda: at.number_input[7].set_value(52).run(), "app", None),
+            ("analyse", lambda: next(b for b in at.button if "Analyse" in b.label).click().run(),
+             "app", "fragment"),
+            ("what-if feature", lambda: at.selectbox[0].set_value("BMI").run(), "app", "fragment"),
+        ]
+        for name, action, before, after in session:
+            steps.setdefault(name, (before, after, []))[2].append(_measure(at, action))
+
+    print(f"{'step':<18} {'bytes':>9} {'markdown':>9} {'elements':>9} {'cpu ms':>8} "
+          f"{'wall ms':>8} {'frag ms':>8}")
+    costs = {"app": [], "fragment": []}
+    for name, (before, after, runs) in steps.items():
+        avg = {k: sum(r[k] for r in runs) / len(runs) for k in runs[0]}
+        print(f"{name:<18} {avg['bytes']:9,.0f} {avg['markdown_bytes']:9,.0f} "
+              f"{avg['elements']:9.0f} {avg['cpu_ms']:8.1f} {avg['wall_ms']:8.1f} "
+              f"{avg['fragment_ms']:8.1f}")
+        if name != "first load":
+            costs["app"].append(avg["cpu_ms"])
+            costs["fragment"].append(avg["fragment_ms"])
+
+    # Interactions after the first load, as a browser would trigger them.
+    full_ms = sum(costs["app"]) / len(costs["app"])
+    frag_ms = sum(costs["fragment"]) / len(costs["fragment"])
+    interactions = [(b, a) for n, (b, a, _) in steps.items() if n != "first load"]
+    cost = {"app": full_ms, "fragment": frag_ms, None: 0.0}
+    before = [b for b, _ in interactions]
+    after = [a for _, a in interactions]
+    print(f"\nsession of {len(interactions)} interactions after first load:")
+    print(f"  per-widget reruns: {sum(b == 'app' for b in before)} full reruns, "
+          f"{sum(cost[b] for b in before):.0f} ms CPU")
+    print(f"  form + fragment:   {sum(a is not None for a in after)} fragment reruns, "
+          f"{sum(cost[a] for a in after):.0f} ms CPU")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Offline-first access to the Pima training data.
+
+The first successful fetch is stored as a memory-mappable ``.npy`` array plus a
+JSON sidecar holding its SHA-256 checksum, so later starts read it locally in
+milliseconds and never touch the network.  Remote fetches use a bounded
+timeout, and every load reports where the data came from:
+
+``cache``      verified local copy
+``remote``     fetched from ``DATA_URL`` (and cached)
+``synthetic``  generated fallback (``synthetic.py``); not clinically meaningful
+
+Set ``DIABETES_OFFLINE=1`` on air-gapped replicas to skip the network
+entirely; seed their cache with ``python diabetes_cli.py fetch-data``
+(or ``--from-csv``) and copy ``DIABETES_DATA_DIR`` across.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from scorer import FEATURES
+
+DATA_URL = "https://raw.githubusercontent.com/jbrownlee/Datasets/master/pima-indians-diabetes.csv"
+COLUMNS = FEATURES + ["Outcome"]
+DATA_DIR = os.environ.get(
+    "DIABETES_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data_cache"),
+)
+FETCH_TIMEOUT = float(os.environ.get("DIABETES_FETCH_TIMEOUT", "5"))
+OFFLINE = os.environ.get("DIABETES_OFFLINE", "").lower() in ("1", "true", "yes")
+
+log = logging.getLogger("diabetes.dataset")
+
+
+def _paths(root=None):
+    root = root or DATA_DIR
+    return os.path.join(root, "pima.npy"), os.path.join(root, "pima.json")
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _frame(values):
+    import pandas as pd
+    frame = pd.DataFrame(np.asarray(values, dtype=np.float64), columns=COLUMNS)
+    frame["Outcome"] = frame["Outcome"].astype(np.int64)
+    return frame
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+def read_meta(root=None):
+    try:
+        with open(_paths(root)[1]) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def read_cache(url=DATA_URL, root=None):
+    """Return the cached frame if present, from ``url`` and intact, else ``None``."""
+    npy, _ = _paths(root)
+    meta = read_meta(root)
+    if meta is None or meta.get("url") != url or not os.path.exists(npy):
+        return None
+    if _sha256_file(npy) != meta.get("sha256"):
+        log.warning("Dataset cache %s failed its checksum; ignoring it", npy)
+        return None
+    return _frame(np.load(npy, mmap_mode="r"))
+
+
+def write_cache(frame, url=DATA_URL, root=None):
+    import artifacts
+
+    root = root or DATA_DIR
+    os.makedirs(root, exist_ok=True)
+    npy, sidecar = _paths(root)
+    tmp = f"{npy}.tmp-{os.getpid()}.npy"
+    np.save(tmp, frame[COLUMNS].to_numpy(dtype=np.float64))
+    meta = {"url": url, "rows": int(len(frame)), "columns": COLUMNS,
+            "sha256": _sha256_file(tmp), "data_hash": artifacts.data_hash(frame),
+            "fetched": time.time()}
+    os.replace(tmp, npy)
+    with open(f"{sidecar}.tmp-{os.getpid()}", "w") as fh:
+        json.dump(meta, fh, indent=2)
+    os.replace(f"{sidecar}.tmp-{os.getpid()}", sidecar)
+    return meta
+
+
+def cached_digest(url=DATA_URL, root=None):
+    """``artifacts.data_hash`` of the cached data, without loading it."""
+    meta = read_meta(root)
+    if meta is None or meta.get("url") != url:
+        return None
+    return meta.get("data_hash")
+
+
+# ── Sources ───────────────────────────────────────────────────────────────────
+def fetch(url=DATA_URL, timeout=FETCH_TIMEOUT):
+    """Download and validate the CSV; raises ``OSError`` / ``ValueError``."""
+    import pandas as pd
+
+    if os.path.exists(url):
+        with open(url, "rb") as fh:
+            raw = fh.read()
+    else:
+        from urllib.request import urlopen
+        with urlopen(url, timeout=timeout) as resp:
+            raw = resp.read()
+    frame = pd.read_csv(io.BytesIO(raw), names=COLUMNS)
+    values = frame.apply(pd.to_numeric, errors="coerce")
+    if frame.empty or values.isna().any().any():
+        raise ValueError(f"{url} is not a {len(COLUMNS)}-column numeric CSV")
+    return _frame(values.to_numpy())
+
+
+def synthetic_data(n=768, seed=42):
+    import synthetic
+    return synthetic.frame(n, seed)
+
+
+def load(url=DATA_URL, offline=None, root=None):
+    """Return ``(frame, source)`` with ``source`` in cache / remote / synthetic."""
+    start = time.perf_counter()
+    frame = read_cache(url, root)
+    if frame is not None:
+        log.info("Dataset from cache in %.1f ms", (time.perf_counter() - start) * 1000)
+        return frame, "cache"
+    if not (OFFLINE if offline is None else offline):
+        try:
+            frame = fetch(url)
+        except (OSError, ValueError) as exc:
+            log.warning("Dataset fetch from %s failed: %s", url, exc)
+        else:
+            try:
+                write_cache(frame, url, root)
+            except OSError as exc:
+                log.warning("Could not write dataset cache: %s", exc)
+            log.info("Dataset fetched in %.1f ms", (time.perf_counter() - start) * 1000)
+            return frame, "remote"
+    log.warning("Using SYNTHETIC training data; predictions are not meaningful")
+    return synthetic_data(), "synthetic"
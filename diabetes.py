@@ -1,12 +1,24 @@
 import streamlit as st
+import altair as alt
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn import svm
-from sklearn.metrics import accuracy_score
+import atexit
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import time
 import warnings
+import batch
+import metrics
+import ui_templates
+import whatif
+from audit import AuditLog
+from prediction_cache import PredictionCache
+from registry import ModelRegistry
 warnings.simplefilter("ignore")
+RERUN_START = time.perf_counter()
 
 # ── Page Config ───────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -15,555 +27,324 @@ st.set_page_config(
     layout="wide",
 )
 
-# ── Train Model ───────────────────────────────────────────────────────────────
+# ── Model ─────────────────────────────────────────────────────────────────────
+BATCH_DIR = os.environ.get("DIABETES_BATCH_DIR")
+# Sidebar with latency histograms and cache counters for operators.
+ADMIN = os.environ.get("DIABETES_ADMIN", "").lower() in ("1", "true", "yes")
+metrics.start_http_server()
+
+@st.cache_resource(show_spinner=False)
+def model_registry():
+    # Retrains in a background thread and hot-swaps validated models, so a
+    # refresh never blocks a session (see registry.py).
+    return ModelRegistry().start()
+
+@st.cache_resource(show_spinner=False)
+def prediction_cache():
+    # One cache for every session; entries are keyed on the model version.
+    return PredictionCache(int(os.environ.get("DIABETES_PREDICTION_CACHE", "4096")))
+
 @st.cache_resource(show_spinner=False)
-def load_model():
-    url = "https://raw.githubusercontent.com/jbrownlee/Datasets/master/pima-indians-diabetes.csv"
-    cols = ["Pregnancies","Glucose","BloodPressure","SkinThickness",
-            "Insulin","BMI","DiabetesPedigreeFunction","Age","Outcome"]
-    try:
-        data = pd.read_csv(url, names=cols)
-    except Exception:
-        np.random.seed(42)
-        n = 768
-        data = pd.DataFrame({
-            "Pregnancies": np.random.randint(0,17,n),
-            "Glucose": np.random.randint(70,200,n),
-            "BloodPressure": np.random.randint(40,122,n),
-            "SkinThickness": np.random.randint(0,99,n),
-            "Insulin": np.random.randint(0,846,n),
-            "BMI": np.round(np.random.uniform(18,67,n),1),
-            "DiabetesPedigreeFunction": np.round(np.random.uniform(0.07,2.4,n),3),
-            "Age": np.random.randint(21,81,n),
-            "Outcome": np.random.randint(0,2,n),
-        })
-
-    X = data.drop(columns="Outcome", axis=1)
-    Y = data["Outcome"]
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    x_train, x_test, y_train, y_test = train_test_split(
-        X_scaled, Y, test_size=0.2, stratify=Y, random_state=2)
-    classifier = svm.SVC(kernel="linear", probability=True)
-    classifier.fit(x_train, y_train)
-    train_acc = accuracy_score(y_train, classifier.predict(x_train))
-    test_acc  = accuracy_score(y_test,  classifier.predict(x_test))
-    return classifier, scaler, train_acc, test_acc
+def audit_log():
+    # Shared by every session; records are written by a background thread.
+    return AuditLog().start()
 
 with st.spinner("Initialising model…"):
-    classifier, scaler, train_acc, test_acc = load_model()
+    model = model_registry().current()
+classifier, scaler, scorer = model.classifier, model.scaler, model.scorer
+train_acc, test_acc, load_info = model.train_acc, model.test_acc, model.info
+model_version = model.version
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  CSS  —  Medical Teal · Dark Theme · Luxury Fintech style
 # ══════════════════════════════════════════════════════════════════════════════
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@500;600;700&family=IBM+Plex+Mono:wght@300;400;500&display=swap');
-
-/* ── Variables ── */
-:root {
-    --bg:         #060d10;
-    --surface:    #0b1519;
-    --surface2:   #101d22;
-    --border:     #182830;
-    --border-hi:  #1f3540;
-    --teal:       #2dd4bf;
-    --teal-light: #7fffd4;
-    --teal-dim:   rgba(45,212,191,0.13);
-    --red:        #f43f5e;
-    --green:      #10b981;
-    --amber:      #f59e0b;
-    --text:       #dff1ee;
-    --muted:      #4a6a70;
-    --head-font:  'Playfair Display', Georgia, serif;
-    --mono-font:  'IBM Plex Mono', monospace;
-    --glow-teal:  0 0 28px rgba(45,212,191,0.22);
-}
-
-/* ── Global ── */
-html, body,
-[data-testid="stAppViewContainer"],
-[data-testid="stAppViewBlockContainer"] {
-    background: var(--bg) !important;
-    font-family: var(--mono-font) !important;
-    color: var(--text) !important;
-}
-[data-testid="stHeader"] { background: transparent !important; }
-#MainMenu, footer, [data-testid="stToolbar"] { visibility: hidden; }
-
-::-webkit-scrollbar { width: 5px; }
-::-webkit-scrollbar-track { background: var(--bg); }
-::-webkit-scrollbar-thumb { background: var(--border-hi); border-radius: 4px; }
-
-/* ══════════════════════════════
-   HERO
-══════════════════════════════ */
-.hero {
-    position: relative;
-    padding: 3rem 3.5rem 2.5rem;
-    margin-bottom: 2.5rem;
-    background: linear-gradient(135deg, #060d10 0%, #0b1c22 60%, #060d10 100%);
-    border: 1px solid var(--border);
-    border-radius: 16px;
-    overflow: hidden;
-}
-.hero::before {
-    content: '';
-    position: absolute; inset: 0;
-    background:
-        radial-gradient(ellipse 60% 50% at 90% 50%, rgba(45,212,191,0.08) 0%, transparent 70%),
-        radial-gradient(ellipse 40% 60% at 10% 80%, rgba(45,212,191,0.04) 0%, transparent 70%);
-    pointer-events: none;
-}
-.hero::after {
-    content: '';
-    position: absolute;
-    top: 0; left: 0; right: 0; height: 2px;
-    background: linear-gradient(90deg, transparent, var(--teal), var(--teal-light), transparent);
-}
-.hero-tag {
-    display: inline-block;
-    font-family: var(--mono-font);
-    font-size: 0.68rem;
-    letter-spacing: 0.25em;
-    text-transform: uppercase;
-    color: var(--teal);
-    background: var(--teal-dim);
-    border: 1px solid rgba(45,212,191,0.28);
-    border-radius: 4px;
-    padding: 0.25rem 0.8rem;
-    margin-bottom: 1rem;
-}
-.hero h1 {
-    font-family: var(--head-font) !important;
-    font-size: 2.8rem !important;
-    font-weight: 700 !important;
-    color: var(--text) !important;
-    line-height: 1.1 !important;
-    letter-spacing: -0.01em;
-    margin: 0 0 0.6rem 0 !important;
-}
-.hero h1 span {
-    background: linear-gradient(135deg, var(--teal), var(--teal-light));
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    background-clip: text;
-}
-.hero-sub {
-    font-size: 0.82rem;
-    color: var(--muted);
-    letter-spacing: 0.04em;
-}
-.hero-badge {
-    position: absolute;
-    right: 3.5rem; top: 50%;
-    transform: translateY(-50%);
-    width: 80px; height: 80px;
-    border-radius: 50%;
-    background: var(--teal-dim);
-    border: 1px solid rgba(45,212,191,0.3);
-    display: flex; align-items: center; justify-content: center;
-    font-size: 2.2rem;
-    box-shadow: var(--glow-teal);
-}
-.status-dot {
-    display: inline-block;
-    width: 7px; height: 7px;
-    border-radius: 50%;
-    background: var(--teal);
-    box-shadow: 0 0 6px var(--teal);
-    margin-right: 0.5rem;
-    vertical-align: middle;
-}
-.status-badge {
-    font-size: 0.7rem; letter-spacing: 0.1em;
-    color: var(--muted); text-transform: uppercase;
-}
-
-/* ── Accuracy Chips ── */
-.acc-row {
-    display: flex; gap: 0.8rem; margin-bottom: 2.5rem; flex-wrap: wrap;
-}
-.acc-chip {
-    background: var(--surface2);
-    border: 1px solid var(--border-hi);
-    border-radius: 8px;
-    padding: 0.6rem 1.2rem;
-    font-size: 0.78rem;
-    color: var(--muted);
-    letter-spacing: 0.05em;
-}
-.acc-chip span {
-    font-family: var(--head-font);
-    font-size: 1.1rem;
-    font-weight: 600;
-    color: var(--teal);
-    margin-right: 0.35rem;
-}
-
-/* ══════════════════════════════
-   SECTION LABELS
-══════════════════════════════ */
-.section-label {
-    font-family: var(--mono-font);
-    font-size: 0.65rem;
-    font-weight: 500;
-    letter-spacing: 0.22em;
-    text-transform: uppercase;
-    color: var(--teal);
-    border-left: 2px solid var(--teal);
-    padding-left: 0.7rem;
-    margin-bottom: 1.4rem;
-    margin-top: 0.5rem;
-}
-
-/* ══════════════════════════════
-   FORM PANELS
-══════════════════════════════ */
-.form-panel {
-    background: var(--surface);
-    border: 1px solid var(--border);
-    border-radius: 14px;
-    padding: 1.8rem 2rem 2rem;
-    position: relative;
-    transition: border-color 0.3s;
-}
-.form-panel:hover { border-color: var(--border-hi); }
-.form-panel::before {
-    content: '';
-    position: absolute;
-    top: 0; left: 1.5rem; right: 1.5rem; height: 1px;
-    background: linear-gradient(90deg, transparent, rgba(45,212,191,0.15), transparent);
-}
-
-/* ══════════════════════════════
-   INPUTS
-══════════════════════════════ */
-[data-testid="stNumberInput"] label,
-[data-testid="stSelectbox"] label,
-.stSlider label {
-    font-family: var(--mono-font) !important;
-    font-size: 0.75rem !important;
-    font-weight: 500 !important;
-    letter-spacing: 0.08em !important;
-    text-transform: uppercase !important;
-    color: var(--muted) !important;
-    margin-bottom: 0.3rem !important;
-}
-[data-testid="stNumberInput"] input {
-    background: var(--surface2) !important;
-    border: 1px solid var(--border) !important;
-    border-radius: 8px !important;
-    color: var(--text) !important;
-    font-family: var(--mono-font) !important;
-    font-size: 0.9rem !important;
-    padding: 0.55rem 0.85rem !important;
-    transition: border-color 0.2s, box-shadow 0.2s !important;
-}
-[data-testid="stNumberInput"] input:focus {
-    border-color: var(--teal) !important;
-    box-shadow: 0 0 0 3px rgba(45,212,191,0.12) !important;
-    outline: none !important;
-}
-[data-testid="stSelectbox"] > div > div {
-    background: var(--surface2) !important;
-    border: 1px solid var(--border) !important;
-    border-radius: 8px !important;
-    color: var(--text) !important;
-    font-family: var(--mono-font) !important;
-    font-size: 0.88rem !important;
-    transition: border-color 0.2s !important;
-}
-[data-testid="stSelectbox"] > div > div:focus-within {
-    border-color: var(--teal) !important;
-    box-shadow: 0 0 0 3px rgba(45,212,191,0.12) !important;
-}
-[data-testid="stSelectbox"] svg { color: var(--teal) !important; }
-[data-testid="stSelectbox"] ul {
-    background: var(--surface2) !important;
-    border: 1px solid var(--border-hi) !important;
-    border-radius: 8px !important;
-}
-[data-testid="stSelectbox"] li {
-    font-family: var(--mono-font) !important;
-    font-size: 0.85rem !important;
-    color: var(--text) !important;
-}
-[data-testid="stSelectbox"] li:hover {
-    background: var(--teal-dim) !important;
-    color: var(--teal-light) !important;
-}
-
-/* Slider */
-[data-testid="stSlider"] > div > div > div > div {
-    background: var(--teal) !important;
-}
-
-/* ══════════════════════════════
-   BUTTON
-══════════════════════════════ */
-[data-testid="stButton"] > button {
-    width: 100% !important;
-    height: 58px !important;
-    background: linear-gradient(135deg, #1a8c7e, var(--teal), #2dd4bf) !important;
-    background-size: 200% 100% !important;
-    color: #060d10 !important;
-    border: none !important;
-    border-radius: 10px !important;
-    font-family: var(--head-font) !important;
-    font-size: 1.1rem !important;
-    font-weight: 600 !important;
-    letter-spacing: 0.05em !important;
-    cursor: pointer !important;
-    transition: all 0.3s ease !important;
-    box-shadow: 0 4px 20px rgba(45,212,191,0.28), 0 1px 0 rgba(255,255,255,0.08) inset !important;
-}
-[data-testid="stButton"] > button:hover {
-    transform: translateY(-2px) !important;
-    box-shadow: 0 8px 32px rgba(45,212,191,0.42), 0 2px 0 rgba(255,255,255,0.12) inset !important;
-}
-[data-testid="stButton"] > button:active {
-    transform: translateY(0) !important;
-}
-
-/* ══════════════════════════════
-   RESULT CARDS
-══════════════════════════════ */
-.result-wrap {
-    animation: fadeSlideUp 0.5s cubic-bezier(0.22,1,0.36,1) both;
-}
-@keyframes fadeSlideUp {
-    from { opacity: 0; transform: translateY(18px); }
-    to   { opacity: 1; transform: translateY(0); }
-}
-.result-diabetic {
-    background: linear-gradient(135deg, rgba(244,63,94,0.1) 0%, rgba(6,13,16,0) 60%);
-    border: 1px solid rgba(244,63,94,0.35);
-    border-top: 3px solid var(--red);
-    border-radius: 14px;
-    padding: 2.5rem 2.5rem 2rem;
-    position: relative; overflow: hidden;
-}
-.result-diabetic::after {
-    content: '';
-    position: absolute; inset: 0;
-    background: radial-gradient(ellipse 80% 60% at 90% 10%, rgba(244,63,94,0.07) 0%, transparent 70%);
-    pointer-events: none;
-}
-.result-safe {
-    background: linear-gradient(135deg, rgba(45,212,191,0.1) 0%, rgba(6,13,16,0) 60%);
-    border: 1px solid rgba(45,212,191,0.32);
-    border-top: 3px solid var(--teal);
-    border-radius: 14px;
-    padding: 2.5rem 2.5rem 2rem;
-    position: relative; overflow: hidden;
-}
-.result-safe::after {
-    content: '';
-    position: absolute; inset: 0;
-    background: radial-gradient(ellipse 80% 60% at 90% 10%, rgba(45,212,191,0.07) 0%, transparent 70%);
-    pointer-events: none;
-}
-.result-icon { font-size: 3rem; margin-bottom: 1rem; display: block; }
-.result-verdict {
-    font-family: var(--head-font);
-    font-size: 2rem; font-weight: 700;
-    margin-bottom: 0.5rem; line-height: 1.1;
-}
-.result-verdict.red   { color: var(--red); }
-.result-verdict.teal  { color: var(--teal); }
-.result-prob-row {
-    display: flex; align-items: center;
-    gap: 1rem; margin-top: 1.4rem;
-}
-.result-prob-label {
-    font-size: 0.72rem;
-    text-transform: uppercase;
-    letter-spacing: 0.15em;
-    color: var(--muted);
-    white-space: nowrap;
-}
-.prob-bar-bg {
-    flex: 1; height: 6px;
-    background: rgba(255,255,255,0.07);
-    border-radius: 4px; overflow: hidden;
-}
-.prob-bar-red {
-    height: 100%; border-radius: 4px;
-    background: linear-gradient(90deg, #f43f5e, #fb7185);
-    box-shadow: 0 0 8px rgba(244,63,94,0.55);
-}
-.prob-bar-teal {
-    height: 100%; border-radius: 4px;
-    background: linear-gradient(90deg, #2dd4bf, #7fffd4);
-    box-shadow: 0 0 8px rgba(45,212,191,0.5);
-}
-.prob-pct {
-    font-family: var(--head-font);
-    font-size: 1.4rem; font-weight: 700;
-    min-width: 64px; text-align: right;
-}
-.prob-pct.red  { color: var(--red); }
-.prob-pct.teal { color: var(--teal); }
-.result-note {
-    font-size: 0.78rem; color: var(--muted);
-    margin-top: 1.4rem; line-height: 1.65;
-    border-top: 1px solid rgba(255,255,255,0.05);
-    padding-top: 1rem;
-}
-
-/* Idle card */
-.idle-card {
-    background: var(--surface);
-    border: 1px dashed var(--border-hi);
-    border-radius: 14px;
-    padding: 3.5rem 2rem;
-    text-align: center; color: var(--muted);
-}
-.idle-icon { font-size: 2.8rem; margin-bottom: 1rem; opacity: 0.45; }
-.idle-head {
-    font-family: var(--head-font);
-    font-size: 1.2rem; color: #1e3a42; margin-bottom: 0.4rem;
-}
-.idle-body { font-size: 0.8rem; line-height: 1.6; }
-
-/* ── Layout helpers ── */
-[data-testid="stHorizontalBlock"] {
-    gap: 1.4rem !important;
-    align-items: stretch !important;
-}
-.block-container {
-    padding-top: 1.5rem !important;
-    padding-bottom: 3rem !important;
-}
-hr { border: none !important; border-top: 1px solid var(--border) !important; margin: 2rem 0 !important; }
-</style>
-""", unsafe_allow_html=True)
+# The stylesheet is served from static/theme.css and cached by the browser, so
+# a rerun only sends this one-line tag (see ui_templates.py).
+st.markdown(ui_templates.theme_tag(st.get_option("server.enableStaticServing")),
+            unsafe_allow_html=True)
 
 # ── Hero ──────────────────────────────────────────────────────────────────────
-st.markdown(f"""
-<div class="hero">
-    <div class="hero-tag">⬡ Clinical Risk Intelligence</div>
-    <h1>Diabetes <span>Risk</span><br>Prediction System</h1>
-    <p class="hero-sub">
-        SVM · Pima Indians Diabetes Dataset &nbsp;·&nbsp;
-        <span class="status-dot"></span>
-        <span class="status-badge">Model Active</span>
-    </p>
-    <div class="hero-badge">🩺</div>
-</div>
-<div class="acc-row">
-    <div class="acc-chip"><span>{train_acc*100:.1f}%</span> Training Accuracy</div>
-    <div class="acc-chip"><span>{test_acc*100:.1f}%</span> Test Accuracy</div>
-    <div class="acc-chip"><span>768</span> Training Samples</div>
-    <div class="acc-chip"><span>8</span> Input Features</div>
-</div>
-""", unsafe_allow_html=True)
-
-# ── Main layout ───────────────────────────────────────────────────────────────
-form_col, result_col = st.columns([1.05, 0.95], gap="medium")
-
-with form_col:
-
-    # ── Section 01 ─────────────────────────────────────
-    st.markdown('<div class="section-label">01 — Patient Metrics</div>', unsafe_allow_html=True)
-    st.markdown('<div class="form-panel">', unsafe_allow_html=True)
-    c1, c2 = st.columns(2)
-    with c1:
-        Pregnancies  = st.number_input("Pregnancies",          0,  17,  1)
-        Glucose      = st.number_input("Glucose (mg/dL)",     50, 250, 120)
-        BloodPressure= st.number_input("Blood Pressure (mmHg)",20, 140,  70)
-        SkinThickness= st.number_input("Skin Thickness (mm)",   0, 100,  23)
-    with c2:
-        Insulin      = st.number_input("Insulin (µU/mL)",       0, 850,  80)
-        BMI          = st.number_input("BMI (kg/m²)",         10.0, 70.0, 32.0, step=0.1, format="%.1f")
-        DPF          = st.number_input("Diabetes Pedigree",   0.05,  2.5, 0.47, step=0.001, format="%.3f")
-        Age          = st.number_input("Age (years)",           21,  90,  33)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-    st.markdown("<div style='height:1.6rem'></div>", unsafe_allow_html=True)
-    predict_btn = st.button("Analyse Diabetes Risk →")
-
-# ── Result Column ─────────────────────────────────────────────────────────────
-with result_col:
-    st.markdown('<div class="section-label">02 — Risk Assessment</div>', unsafe_allow_html=True)
-
-    if predict_btn:
-        input_array  = np.array([[Pregnancies, Glucose, BloodPressure,
-                                   SkinThickness, Insulin, BMI, DPF, Age]])
-        scaled_input = scaler.transform(input_array)
-        prediction   = classifier.predict(scaled_input)[0]
-        proba        = classifier.predict_proba(scaled_input)[0]
-        risk_pct     = proba[1] * 100
-        safe_pct     = proba[0] * 100
-
-        if prediction == 1:
-            st.markdown(f"""
-            <div class="result-wrap">
-            <div class="result-diabetic">
-                <span class="result-icon">🔴</span>
-                <div class="result-verdict red">Diabetic — High Risk</div>
-                <div style="font-size:0.82rem;color:#8a9aaa;margin-top:0.3rem">
-                    Patient profile indicates elevated diabetes risk.
-                </div>
-                <div class="result-prob-row">
-                    <span class="result-prob-label">Diabetes<br>Probability</span>
-                    <div class="prob-bar-bg">
-                        <div class="prob-bar-red" style="width:{risk_pct:.1f}%"></div>
-                    </div>
-                    <span class="prob-pct red">{risk_pct:.1f}%</span>
-                </div>
-                <div class="result-note">
-                    ⚠ Model predicts a <strong style="color:#f43f5e">{risk_pct:.1f}%</strong>
-                    probability of diabetes based on the given parameters.
-                    Please consult a qualified healthcare professional for
-                    clinical diagnosis and treatment.
-                </div>
-            </div>
-            </div>
-            """, unsafe_allow_html=True)
+cv = load_info.get("cv")
+cv_chip = ui_templates.CV_CHIP.substitute(
+    mean=f"{cv['mean']*100:.1f}", std=f"{cv['std']*100:.1f}", folds=cv["folds"]) if cv else ""
+if load_info["path"] == "synthetic":
+    status_dot, status_text = "status-dot warn", "Synthetic Data — Not Clinically Valid"
+else:
+    status_dot, status_text = "status-dot", f"Model Active · {load_info['data']} data"
+
+with metrics.timer("diabetes_render_seconds", part="hero"):
+    st.markdown(ui_templates.HERO.substitute(
+        status_dot=status_dot, status_text=status_text,
+        train_acc=f"{train_acc*100:.1f}", test_acc=f"{test_acc*100:.1f}", cv_chip=cv_chip,
+        cold_ms=f"{load_info['seconds']*1000:.0f}", load_path=load_info["path"],
+        model_version=model_version,
+    ), unsafe_allow_html=True)
+
+if load_info["path"] == "synthetic":
+    st.warning("The Pima dataset could not be loaded from the local cache or the network, "
+               "so the model was trained on random synthetic data. Risk scores are not meaningful.")
+
+# ── Assessment ────────────────────────────────────────────────────────────────
+# Submitting the form or changing the what-if controls reruns only this
+# fragment; the page header and batch section are left alone.
+@st.fragment
+def assessment_panel():
+    start = time.perf_counter()
+    # Re-read on fragment reruns so a hot-swapped model is picked up at once.
+    model = model_registry().current()
+    scorer, model_version = model.scorer, model.version
+    form_col, result_col = st.columns([1.05, 0.95], gap="medium")
+
+    with form_col:
+
+        # ── Section 01 ─────────────────────────────────
+        st.markdown('<div class="section-label">01 — Patient Metrics</div>', unsafe_allow_html=True)
+        # Edits stay in the browser until the form is submitted.
+        with st.form("patient", border=False):
+            st.markdown('<div class="form-panel">', unsafe_allow_html=True)
+            c1, c2 = st.columns(2)
+            with c1:
+                Pregnancies  = st.number_input("Pregnancies",          0,  17,  1)
+                Glucose      = st.number_input("Glucose (mg/dL)",     50, 250, 120)
+                BloodPressure= st.number_input("Blood Pressure (mmHg)",20, 140,  70)
+                SkinThickness= st.number_input("Skin Thickness (mm)",   0, 100,  23)
+            with c2:
+                Insulin      = st.number_input("Insulin (µU/mL)",       0, 850,  80)
+                BMI          = st.number_input("BMI (kg/m²)",         10.0, 70.0, 32.0, step=0.1, format="%.1f")
+                DPF          = st.number_input("Diabetes Pedigree",   0.05,  2.5, 0.47, step=0.001, format="%.3f")
+                Age          = st.number_input("Age (years)",           21,  90,  33)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown("<div style='height:1.6rem'></div>", unsafe_allow_html=True)
+            predict_btn = st.form_submit_button("Analyse Diabetes Risk →")
+
+    # ── Result Column ─────────────────────────────────────────────────────────
+    with result_col:
+        st.markdown('<div class="section-label">02 — Risk Assessment</div>', unsafe_allow_html=True)
+
+        patient = np.array([Pregnancies, Glucose, BloodPressure, SkinThickness,
+                            Insulin, BMI, DPF, Age], dtype=np.float64)
+        if predict_btn:
+            result = prediction_cache().get_or_score(patient, scorer, model_version)
+            st.session_state["assessment"] = (model_version, result)
+            audit_log().record(patient, model_version, result[1], result[0], source="app")
+            if model.monitor is not None:
+                model.monitor.update(patient)
+        # Form values only change on submit, so the last result stays valid until
+        # the next one (or a model change).
+        last = st.session_state.get("assessment")
+        if last is not None and last[0] == model_version:
+            prediction, proba, _ = last[1]
+            risk_pct     = proba * 100
+            safe_pct     = 100 - risk_pct
+
+            template = ui_templates.RESULT_DIABETIC if prediction == 1 else ui_templates.RESULT_SAFE
+            with metrics.timer("diabetes_render_seconds", part="result"):
+                st.markdown(template.substitute(risk_pct=f"{risk_pct:.1f}", safe_pct=f"{safe_pct:.1f}"),
+                            unsafe_allow_html=True)
+        else:
+            st.markdown(ui_templates.IDLE_CARD, unsafe_allow_html=True)
+
+        st.markdown(ui_templates.DISCLAIMER, unsafe_allow_html=True)
+
+    # ── What-If Analysis ──────────────────────────────────────────────────────
+    st.markdown("<hr>", unsafe_allow_html=True)
+    st.markdown('<div class="section-label">03 — What-If Analysis</div>', unsafe_allow_html=True)
+    whatif_ctrl, whatif_plot = st.columns([0.35, 0.65], gap="medium")
+
+    with whatif_ctrl:
+        st.caption("Sweep one or two inputs across their full range while the other "
+                   "patient metrics stay as last submitted above.")
+        x_feature = st.selectbox("Sweep", list(whatif.LABELS), index=1,
+                                 format_func=whatif.LABELS.get)
+        y_feature = st.selectbox("…against (optional)", [None] + [f for f in whatif.LABELS if f != x_feature],
+                                 format_func=lambda f: "— none —" if f is None else whatif.LABELS[f])
+        resolution = st.slider("Grid resolution", 20, 200, 200, step=10)
+
+    with whatif_plot:
+        current = dict(zip(whatif.LABELS, patient))
+        t0 = time.perf_counter()
+        if y_feature is None:
+            xs, proba = whatif.sweep(scorer, patient, x_feature, resolution)
+            frame = pd.DataFrame({"x": xs, "risk": proba * 100})
+            chart = alt.Chart(frame).mark_line(color="#2dd4bf", strokeWidth=2.5).encode(
+                x=alt.X("x:Q", title=whatif.LABELS[x_feature], scale=alt.Scale(zero=False)),
+                y=alt.Y("risk:Q", title="Diabetes probability (%)", scale=alt.Scale(domain=[0, 100])),
+            )
+            marker = alt.Chart(pd.DataFrame({"x": [current[x_feature]]})).mark_rule(
+                color="#f43f5e", strokeDash=[4, 4]).encode(x="x:Q")
+            n_points = len(xs)
         else:
-            st.markdown(f"""
-            <div class="result-wrap">
-            <div class="result-safe">
-                <span class="result-icon">🟢</span>
-                <div class="result-verdict teal">Non-Diabetic — Low Risk</div>
-                <div style="font-size:0.82rem;color:#8a9aaa;margin-top:0.3rem">
-                    Patient parameters appear within a healthy range.
-                </div>
-                <div class="result-prob-row">
-                    <span class="result-prob-label">Healthy<br>Confidence</span>
-                    <div class="prob-bar-bg">
-                        <div class="prob-bar-teal" style="width:{safe_pct:.1f}%"></div>
-                    </div>
-                    <span class="prob-pct teal">{safe_pct:.1f}%</span>
-                </div>
-                <div class="result-note">
-                    ✅ Model confidence of <strong style="color:#2dd4bf">{safe_pct:.1f}%</strong>
-                    non-diabetic. Diabetes probability is only
-                    <strong style="color:#f43f5e">{risk_pct:.1f}%</strong>.
-                    Maintain a balanced diet and schedule regular check-ups.
-                </div>
-            </div>
-            </div>
-            """, unsafe_allow_html=True)
-    else:
-        st.markdown("""
-        <div class="idle-card">
-            <div class="idle-icon">◈</div>
-            <div class="idle-head">Awaiting Analysis</div>
-            <div class="idle-body">
-                Enter patient metrics on the left<br>
-                and click <em>Analyse Diabetes Risk</em><br>
-                to generate a risk assessment.
-            </div>
-        </div>""", unsafe_allow_html=True)
-
-    st.markdown("""
-    <div style="margin-top:2rem;font-size:0.72rem;color:#2a4a50;
-                border-top:1px solid #182830;padding-top:1rem;line-height:1.7">
-        This tool is for educational and informational purposes only.
-        It does not constitute medical advice or replace clinical diagnosis
-        by a qualified healthcare provider.
-    </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+            xs, ys, proba = whatif.grid(scorer, patient, x_feature, y_feature, resolution)
+            # Cell edges half a step either side of each sweep value.
+            def edges(v):
+                step = (v[1] - v[0]) if len(v) > 1 else 1.0
+                return v - step / 2, v + step / 2
+            (x0, x1), (y0, y1) = edges(xs), edges(ys)
+            frame = pd.DataFrame({
+                "x": np.tile(x0, len(ys)), "x2": np.tile(x1, len(ys)),
+                "y": np.repeat(y0, len(xs)), "y2": np.repeat(y1, len(xs)),
+                "risk": (proba.ravel() * 100).astype(np.float32),
+            })
+            chart = alt.Chart(frame).mark_rect().encode(
+                x=alt.X("x:Q", title=whatif.LABELS[x_feature], scale=alt.Scale(zero=False, nice=False)),
+                x2="x2:Q",
+                y=alt.Y("y:Q", title=whatif.LABELS[y_feature], scale=alt.Scale(zero=False, nice=False)),
+                y2="y2:Q",
+                color=alt.Color("risk:Q", title="Risk %",
+                                scale=alt.Scale(domain=[0, 100], range=["#2dd4bf", "#f5c542", "#f43f5e"])),
+            )
+            marker = alt.Chart(pd.DataFrame({"x": [current[x_feature]], "y": [current[y_feature]]})).mark_point(
+                shape="cross", size=160, color="#ffffff", strokeWidth=2).encode(x="x:Q", y="y:Q")
+            n_points = proba.size
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        st.altair_chart((chart + marker).properties(height=360))
+        st.caption(f"{n_points:,} profiles scored in one batch · {elapsed_ms:.1f} ms")
+    metrics.observe("diabetes_rerun_seconds", time.perf_counter() - start, scope="fragment")
+
+
+assessment_panel()
+
+# ── Cohort Batch Scoring ──────────────────────────────────────────────────────
+st.markdown("<hr>", unsafe_allow_html=True)
+st.markdown('<div class="section-label">04 — Cohort Batch Scoring</div>', unsafe_allow_html=True)
+upload_col, batch_col = st.columns([1.05, 0.95], gap="medium")
+
+with upload_col:
+    uploaded = st.file_uploader("Cohort file (CSV / Parquet)", type=["csv", "parquet"])
+    local_name = None
+    # Server-side files are only readable from an explicitly configured folder.
+    if BATCH_DIR:
+        local_name = st.text_input(f"…or a file name in {BATCH_DIR}")
+    out_format = st.selectbox("Output format", ["csv", "parquet"])
+    batch_btn = st.button("Score Cohort →")
+
+with batch_col:
+    if batch_btn:
+        if uploaded is not None:
+            source, source_name = uploaded, uploaded.name
+        elif local_name:
+            source = os.path.join(BATCH_DIR, os.path.basename(local_name))
+            source_name = source
+        else:
+            source = None
+            st.warning("Upload a cohort file or enter a local file name first.")
+        if source is not None:
+            # One scratch folder per session: the previous run's scored copy of
+            # the cohort is deleted before a new one is written.
+            previous = st.session_state.pop("batch_workdir", None)
+            if previous:
+                shutil.rmtree(previous, ignore_errors=True)
+            st.session_state.pop("batch_result", None)
+            workdir = tempfile.mkdtemp(prefix="cohort-")
+            st.session_state["batch_workdir"] = workdir
+            atexit.register(shutil.rmtree, workdir, True)
+            out_path = os.path.join(workdir, f"scored.{out_format}")
+            rejects_path = os.path.join(workdir, "rejects.csv")
+            bar = st.progress(0.0)
+            status = st.empty()
+
+            def on_progress(rows, rejected, elapsed, fraction):
+                bar.progress(fraction)
+                status.markdown(f"{rows:,} rows scored · {rows / max(elapsed, 1e-9):,.0f} rows/s"
+                                f" · {rejected:,} rejected")
+            try:
+                stats = batch.score_stream(source, scorer, out_path, rejects_path,
+                                           fmt=batch.detect_format(source_name),
+                                           progress=on_progress, monitor=model.monitor,
+                                           audit=audit_log(), model_version=model_version)
+            except (OSError, ValueError, ImportError) as exc:
+                st.error(f"Batch scoring failed: {exc}")
+            else:
+                st.session_state["batch_result"] = (stats, out_path, rejects_path)
+
+    if "batch_result" in st.session_state:
+        stats, out_path, rejects_path = st.session_state["batch_result"]
+        st.markdown(ui_templates.BATCH_CHIPS.substitute(
+            rows=f"{stats.rows:,}", rejected=f"{stats.rejected:,}",
+            rate=f"{stats.rows / max(stats.seconds, 1e-9):,.0f}",
+        ), unsafe_allow_html=True)
+        if os.path.exists(out_path):
+            with open(out_path, "rb") as fh:
+                st.download_button("Download scored cohort", fh,
+                                   file_name=os.path.basename(out_path))
+        if os.path.exists(rejects_path):
+            with open(rejects_path, "rb") as fh:
+                st.download_button("Download rejected rows", fh, file_name="rejects.csv")
+
+# ── Admin ─────────────────────────────────────────────────────────────────────
+if ADMIN:
+    with st.sidebar:
+        st.markdown('<div class="section-label">Admin — Instrumentation</div>', unsafe_allow_html=True)
+        if not metrics.ENABLED:
+            st.caption("Metrics are off; set DIABETES_METRICS=1 to record timings.")
+        else:
+            rows = [{"metric": name, "labels": ",".join(f"{k}={v}" for k, v in labels.items()),
+                     "count": count,
+                     "p50 ms": None if p50 is None else round(p50 * 1000, 3),
+                     "p99 ms": None if p99 is None else round(p99 * 1000, 3)}
+                    for name, labels, count, _, p50, p99 in metrics.snapshot()]
+            st.dataframe(pd.DataFrame(rows), hide_index=True)
+            st.download_button("Prometheus metrics", metrics.render(),
+                               file_name="diabetes.prom", mime="text/plain")
+        cache_stats = prediction_cache().stats()
+        st.caption(f"Prediction cache: {cache_stats['size']}/{cache_stats['maxsize']} entries · "
+                   f"{cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+                   f"{cache_stats['evictions']} evictions · model {model_version}")
+
+        st.markdown('<div class="section-label">Admin — Input Drift</div>', unsafe_allow_html=True)
+        monitor = model_registry().current().monitor
+        if monitor is None:
+            st.caption("No reference profile for this model; retrain to enable drift monitoring.")
+        else:
+            report = monitor.report()
+            st.caption(f"{report['count']:,} inputs since model load vs {report['reference_count']:,} "
+                       f"training rows · PSI > {report['psi_threshold']} after "
+                       f"{report['min_count']} inputs flags drift")
+            if report["drifted"]:
+                st.warning(f"Input drift: {', '.join(report['drifted'])}")
+            if report["count"]:
+                st.dataframe(pd.DataFrame(report["features"])[["feature", "psi", "ks", "shift", "drift"]]
+                             .round(3), hide_index=True)
+
+        st.markdown('<div class="section-label">Admin — Audit Log</div>', unsafe_allow_html=True)
+        audit_stats = audit_log().stats()
+        st.caption(f"{audit_stats['written']:,} written · {audit_stats['queued']:,} queued · "
+                   f"{audit_stats['dropped']:,} dropped · {audit_stats['invalid']:,} invalid"
+                   + (f" · last error: {audit_stats['last_error']}" if audit_stats["last_error"] else ""))
+        today = datetime.date.today()
+        audit_range = st.date_input("Export range", (today - datetime.timedelta(days=7), today))
+        if len(audit_range) == 2 and st.button("Prepare audit export"):
+            buffer = io.StringIO()
+            audit_log().flush(timeout=2.0)
+            # Dates are UTC days; the end day is included.
+            start, end = (datetime.datetime.combine(d, datetime.time(), datetime.timezone.utc)
+                          for d in (audit_range[0], audit_range[1] + datetime.timedelta(days=1)))
+            count = audit_log().export(buffer, start, end)
+            st.session_state["audit_export"] = (count, buffer.getvalue(),
+                                                f"audit-{audit_range[0]}-{audit_range[1]}.csv")
+        if "audit_export" in st.session_state:
+            count, data, file_name = st.session_state["audit_export"]
+            st.download_button(f"Download {count:,} audit records", data,
+                               file_name=file_name, mime="text/csv")
+
+        registry = model_registry()
+        st.markdown('<div class="section-label">Admin — Model Registry</div>', unsafe_allow_html=True)
+        st.caption(f"Live {registry.current().version} · {registry.status}"
+                   + (f" · last error: {registry.last_error}" if registry.last_error else ""))
+        retrain_col, rollback_col = st.columns(2)
+        if retrain_col.button("Retrain now", disabled=registry.status == "training"):
+            registry.request_retrain()
+            st.toast("Retraining in the background; the live model keeps serving.")
+        if rollback_col.button("Roll back"):
+            try:
+                st.toast(f"Rolled back to {registry.rollback().version}.")
+            except LookupError as exc:
+                st.toast(str(exc))
+        history = registry.history()[-10:][::-1]
+        if history:
+            st.dataframe(pd.DataFrame(history)[["event", "version", "accuracy", "reason"]],
+                         hide_index=True)
+
+metrics.observe("diabetes_rerun_seconds", time.perf_counter() - RERUN_START, scope="app")
+metrics.maybe_write_file()
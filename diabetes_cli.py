@@ -0,0 +1,300 @@
+"""Command-line scoring without Streamlit.
+
+    python diabetes_cli.py train
+    python diabetes_cli.py export --out model.json
+    python diabetes_cli.py update new_labels.csv --holdout holdout.csv
+    python diabetes_cli.py score cohort1.csv cohort2.parquet --out-dir scored/
+    python diabetes_cli.py synth 10000000 --out cohort.parquet --seed 0
+    python diabetes_cli.py train-store cohort.npy --export model.json
+
+Files are scored in parallel, one per worker process.  The scorer is compiled
+once in the parent and shipped to the workers, so they never import
+scikit-learn.  Workers spool their audit records as they score; the parent's
+audit writer ingests the spool and drains it before exiting.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import diabetes_core
+
+_worker_scorer = None
+_worker_audit = None
+_worker_version = None
+
+
+def _init_worker(scorer, audit_path, model_version):
+    global _worker_scorer, _worker_audit, _worker_version
+    from audit import AuditLog
+    # Never started: record_bulk only writes spool segments.
+    _worker_scorer, _worker_audit = scorer, AuditLog(audit_path)
+    _worker_version = model_version
+
+
+def _output_paths(path, out_dir, out_format):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return (os.path.join(out_dir, f"{stem}.scored.{out_format}"),
+            os.path.join(out_dir, f"{stem}.rejects.csv"))
+
+
+def _score_one_file(path, out_dir, out_format, chunksize):
+    out_path, rejects_path = _output_paths(path, out_dir, out_format)
+    stats = diabetes_core.score_file(path, out_path, rejects_path, scorer=_worker_scorer,
+                                     chunksize=chunksize, audit=_worker_audit,
+                                     model_version=_worker_version)
+    return path, out_path, stats
+
+
+def _print_stages(info):
+    import pipeline
+    if info.get("timings"):
+        print("stages: " + pipeline.report(info["timings"], info.get("cached")))
+
+
+def cmd_train(args):
+    classifier, scaler, train_acc, test_acc, info = diabetes_core.load(args.backend)
+    print(f"model {info['version'] or '(not persisted)'} via {info['path']} "
+          f"in {info['seconds'] * 1000:.0f} ms · train {train_acc:.3f} · test {test_acc:.3f}")
+    _print_stages(info)
+    return 0
+
+
+def cmd_train_store(args):
+    import outofcore
+    timings = {}
+    classifier, scaler, train_acc, test_acc = outofcore.train(
+        args.store, chunksize=args.chunksize, epochs=args.epochs, timings=timings)
+    print(f"trained out-of-core on {args.store} · train {train_acc:.4f} · test {test_acc:.4f} · "
+          + ", ".join(f"{k} {v:.1f} s" for k, v in timings.items()))
+    if args.export:
+        import model_export
+        model_export.export(classifier, scaler, args.export)
+        print(f"exported to {args.export}")
+    return 0
+
+
+def _read_labelled(path):
+    import pandas as pd
+    from scorer import FEATURES
+    frame = pd.read_parquet(path) if path.endswith((".parquet", ".pq")) else pd.read_csv(path)
+    return frame[FEATURES].to_numpy(float), frame["Outcome"].to_numpy()
+
+
+def cmd_export(args):
+    import model_export
+    classifier, scaler, *_, info = diabetes_core.load(args.backend)
+    model_export.export(classifier, scaler, args.out, model_version=info["version"])
+    print(f"exported model {info['version'] or '(not persisted)'} to {args.out} "
+          f"({os.path.getsize(args.out):,} bytes); score it with tiny_scorer.TinyScorer")
+    return 0
+
+
+def cmd_fetch_data(args):
+    import dataset
+    frame = dataset.fetch(args.from_csv or dataset.DATA_URL)
+    meta = dataset.write_cache(frame)
+    print(f"cached {meta['rows']} rows in {dataset.DATA_DIR} (sha256 {meta['sha256'][:12]})")
+    return 0
+
+
+def cmd_fetch_fonts(args):
+    from urllib.request import urlopen
+
+    import dataset
+    import ui_templates
+    font_dir = os.path.join(ui_templates.STATIC_DIR, "fonts")
+    os.makedirs(font_dir, exist_ok=True)
+    for name, url in ui_templates.FONT_FILES.items():
+        with urlopen(url, timeout=dataset.FETCH_TIMEOUT * 6) as resp:
+            data = resp.read()
+        with open(os.path.join(font_dir, name), "wb") as fh:
+            fh.write(data)
+        print(f"{name}: {len(data):,} bytes")
+    return 0
+
+
+def cmd_retrain(args):
+    import incremental
+    classifier, scaler, train_acc, test_acc, info = diabetes_core.retrain(
+        args.backend, cache=not args.no_cache)
+    print(f"model {info['version'] or '(not persisted)'} retrained in "
+          f"{info['seconds'] * 1000:.0f} ms · train {train_acc:.3f} · test {test_acc:.3f}")
+    _print_stages(info)
+    if args.holdout and info["version"]:
+        acc = incremental.holdout_accuracy(classifier, scaler, *_read_labelled(args.holdout))
+        incremental.record_accuracy(info["version"], "full", acc)
+        print(f"holdout accuracy {acc:.4f}")
+    return 0
+
+
+def cmd_update(args):
+    import incremental
+    X, y = _read_labelled(args.file)
+    holdout = _read_labelled(args.holdout) if args.holdout else None
+    meta = incremental.publish_update(X, y, holdout=holdout)
+    print(f"published {meta['version']} (parent {meta['parent']}, +{meta['rows_added']} rows, "
+          f"{meta['rows_seen']} seen)")
+    if holdout is not None:
+        print(f"holdout accuracy {incremental.accuracy_history()[-1]['holdout_acc']:.4f}")
+        if incremental.needs_rebuild():
+            print("accuracy has drifted below the last full retrain: run 'retrain'")
+            return 2
+    return 0
+
+
+def cmd_synth(args):
+    import synthetic
+    summary = synthetic.write(args.out, args.rows, seed=args.seed, fmt=args.format,
+                              chunksize=args.chunksize, dtype=args.dtype)
+    print(f"wrote {summary['rows']:,} rows to {summary['path']} in {summary['seconds']:.1f} s "
+          f"({summary['rows'] / max(summary['seconds'], 1e-9):,.0f} rows/s, "
+          f"{summary['positive_rate']:.1%} positive)")
+    return 0
+
+
+def cmd_audit_export(args):
+    from audit import AuditLog
+    log = AuditLog(args.db) if args.db else AuditLog()
+    count = log.export(sys.stdout if args.out == "-" else args.out, args.start, args.end)
+    print(f"exported {count:,} audit records", file=sys.stderr)
+    return 0
+
+
+def cmd_rollback(args):
+    from registry import ModelRegistry
+    registry = ModelRegistry(args.backend)
+    previous = registry.current().version
+    try:
+        model = registry.rollback(args.version)
+    except LookupError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(f"rolled back {previous} -> {model.version}")
+    return 0
+
+
+def cmd_score(args):
+    from audit import AuditLog
+    from scorer import LinearScorer
+    # Workers write in parallel, so two inputs must never share an output.
+    seen = {}
+    for path in args.files:
+        out_path = _output_paths(path, args.out_dir, args.format)[0]
+        if out_path in seen:
+            print(f"error: {seen[out_path]} and {path} would both be written to {out_path}; "
+                  "rename one or score them separately", file=sys.stderr)
+            return 2
+        seen[out_path] = path
+    os.makedirs(args.out_dir, exist_ok=True)
+    classifier, scaler, *_, info = diabetes_core.load()
+    scorer = LinearScorer.from_model(classifier, scaler)
+    audit = AuditLog().start()
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(args.files)))
+    start = time.perf_counter()
+    total = failed = 0
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(scorer, audit.path, info["version"])) as pool:
+        futures = [pool.submit(_score_one_file, f, args.out_dir, args.format,
+                               args.chunksize) for f in args.files]
+        for fut in as_completed(futures):
+            try:
+                path, out_path, stats = fut.result()
+            except Exception as exc:
+                failed += 1
+                print(f"error: {exc}", file=sys.stderr)
+                continue
+            total += stats.rows
+            print(f"{path} -> {out_path}: {stats.rows:,} rows, {stats.rejected:,} rejected, "
+                  f"{stats.rows / max(stats.seconds, 1e-9):,.0f} rows/s")
+    audit.close()
+    if audit.stats()["spooled"]:
+        print(f"{audit.stats()['spooled']} audit spool segment(s) not yet written; "
+              "the next audit writer will ingest them", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+    print(f"{total:,} rows in {elapsed:.2f} s across {workers} worker(s) "
+          f"({total / max(elapsed, 1e-9):,.0f} rows/s)")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diabetes risk model CLI")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("train", help="load or train the model artifact")
+    p.add_argument("--backend", choices=["select", "auto", "svc", "linear", "sgd"], default=None,
+                   help="training backend (default: $DIABETES_BACKEND or select)")
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser("train-store", help="train out-of-core on a memory-mapped .npy store")
+    p.add_argument("store", help="(n, 9) .npy in dataset column order, e.g. from 'synth'")
+    p.add_argument("--chunksize", type=int, default=1 << 18)
+    p.add_argument("--epochs", type=int, default=5)
+    p.add_argument("--export", help="also write the model as JSON (see 'export')")
+    p.set_defaults(func=cmd_train_store)
+
+    p = sub.add_parser("export", help="write the model as a dependency-free JSON file")
+    p.add_argument("--out", default="model.json")
+    p.add_argument("--backend", choices=["select", "auto", "svc", "linear", "sgd"], default=None,
+                   help="training backend (default: $DIABETES_BACKEND or select)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("fetch-data", help="download (or import) the dataset into the local cache")
+    p.add_argument("--from-csv", help="seed the cache from a local CSV instead of the network")
+    p.set_defaults(func=cmd_fetch_data)
+
+    p = sub.add_parser("fetch-fonts", help="download the UI fonts into static/fonts")
+    p.set_defaults(func=cmd_fetch_fonts)
+
+    p = sub.add_parser("retrain", help="force a full retrain and publish it")
+    p.add_argument("--backend", choices=["select", "auto", "svc", "linear", "sgd"], default=None,
+                   help="training backend (default: $DIABETES_BACKEND or select)")
+    p.add_argument("--holdout", help="labelled CSV / Parquet to log accuracy on")
+    p.add_argument("--no-cache", action="store_true",
+                   help="refit every pipeline stage instead of reusing cached ones")
+    p.set_defaults(func=cmd_retrain)
+
+    p = sub.add_parser("update", help="fold newly labelled records into the current model")
+    p.add_argument("file", help="CSV / Parquet with the feature columns and Outcome")
+    p.add_argument("--holdout", help="labelled CSV / Parquet to log accuracy on")
+    p.set_defaults(func=cmd_update)
+
+    p = sub.add_parser("synth", help="write a seeded synthetic cohort of any size")
+    p.add_argument("rows", type=int)
+    p.add_argument("--out", required=True, help=".csv, .parquet or .npy (memory-mapped)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--format", choices=["csv", "parquet", "npy"], default=None)
+    p.add_argument("--chunksize", type=int, default=1 << 18)
+    p.add_argument("--dtype", choices=["float32", "float64"], default="float32",
+                   help="element type of .npy output")
+    p.set_defaults(func=cmd_synth)
+
+    p = sub.add_parser("audit-export", help="export audit records for a time range as CSV")
+    p.add_argument("--start", help="ISO 8601 time (UTC unless an offset is given), inclusive")
+    p.add_argument("--end", help="ISO 8601 time, exclusive")
+    p.add_argument("--out", default="-", help="CSV path, or - for stdout")
+    p.add_argument("--db", help="audit database (default DIABETES_AUDIT_DB)")
+    p.set_defaults(func=cmd_audit_export)
+
+    p = sub.add_parser("rollback", help="make an earlier model version current again")
+    p.add_argument("version", nargs="?", help="defaults to the one promoted before the live model")
+    p.add_argument("--backend", choices=["select", "auto", "svc", "linear", "sgd"], default=None,
+                   help="training backend (default: $DIABETES_BACKEND or select)")
+    p.set_defaults(func=cmd_rollback)
+
+    p = sub.add_parser("score", help="score CSV / Parquet cohort files")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--out-dir", default="scored")
+    p.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    p.add_argument("--workers", type=int, default=None,
+                   help="worker processes (default: all cores)")
+    p.add_argument("--chunksize", type=int, default=50_000)
+    p.set_defaults(func=cmd_score)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Headless data loading, training and scoring for the diabetes model.
+
+Importing this module does not import Streamlit, and pandas / scikit-learn are
+only imported by the functions that need them, so workers and the CLI start
+quickly.
+
+    classifier, scaler, train_acc, test_acc = train(load_data()[0])
+    classifier, scaler, train_acc, test_acc, info = load()
+    label, proba, margin = score_one([1, 120, 70, 23, 80, 32.0, 0.47, 33])
+    labels, probas, margins = score_batch(rows)
+"""
+import logging
+import os
+import threading
+import time
+
+import metrics
+from dataset import COLUMNS, DATA_URL  # noqa: F401
+from scorer import LinearScorer
+# Training backend, see backends.py: auto | svc | linear | sgd, or ``select``
+# to pick backend and hyperparameters by cross-validation (selection.py).
+BACKEND = os.environ.get("DIABETES_BACKEND", "select")
+
+log = logging.getLogger("diabetes")
+
+
+# ── Data ──────────────────────────────────────────────────────────────────────
+def load_data():
+    """Return ``(data, source)``; see ``dataset.load`` for the source values."""
+    import dataset
+    return dataset.load()
+
+
+# ── Train / load ──────────────────────────────────────────────────────────────
+def train(data, backend=None, timings=None, cv=None, params=None, cache=None):
+    """Fit scaler + classifier; returns ``(classifier, scaler, train_acc, test_acc)``.
+
+    Runs the staged pipeline (``pipeline.py``).  ``backend`` selects the
+    solver (see ``backends.py``); the default comes from ``DIABETES_BACKEND``.
+    ``params`` (``C``, ``class_weight``) go to a fixed backend.  With
+    ``select``, the backend and its hyperparameters are chosen by stratified
+    k-fold CV on the training split and, if ``cv`` is a dict, the chosen
+    parameters and CV scores are stored in it.  ``cache`` is the stage cache
+    directory (``True`` for the default one, ``None`` to fit from scratch).
+    If ``timings`` is a dict, per-stage seconds are stored in it (see
+    ``pipeline.run``).
+    """
+    import pipeline
+
+    run = pipeline.run(data, backend or BACKEND, params, cache=cache)
+    if timings is not None:
+        timings.update(run.timings)
+    if cv is not None and run.cv:
+        cv.update(run.cv)
+    return run.classifier, run.scaler, run.train_acc, run.test_acc
+
+
+def _params(backend):
+    """Artifact parameters; a changed search space invalidates ``select`` models."""
+    if backend == "select":
+        import selection
+        return {"backend": backend, "search": selection.search_key()}
+    return {"backend": backend}
+
+
+def load(backend=None, version=None):
+    """Load the current model artifact, or fetch + train + persist one.
+
+    Returns ``(classifier, scaler, train_acc, test_acc, info)`` where ``info``
+    records which path was taken and how long it took.  With ``version`` that
+    artifact is loaded instead of CURRENT, and ``LookupError`` is raised if it
+    is missing or incompatible.
+    """
+    import artifacts
+    import dataset
+
+    backend = backend or BACKEND
+    start = time.perf_counter()
+    # With a local dataset cache the artifact is also checked against the
+    # data it was trained on; without one it is trusted by source alone.
+    cached = artifacts.load(version, source=DATA_URL, params=_params(backend),
+                            expected_hash=None if version else dataset.cached_digest())
+    if cached is not None:
+        bundle, meta = cached
+        info = {"path": "artifact", "version": meta["version"],
+                "data": meta.get("data_source", "remote"), "cv": meta.get("cv"),
+                "profile": meta.get("profile"), "seconds": time.perf_counter() - start}
+        metrics.observe("diabetes_load_phase_seconds", info["seconds"], phase="artifact")
+        log.info("Loaded model artifact %s in %.1f ms",
+                 info["version"], info["seconds"] * 1000)
+        return (bundle["classifier"], bundle["scaler"],
+                bundle["train_acc"], bundle["test_acc"], info)
+    if version:
+        raise LookupError(f"Model artifact {version} is missing or incompatible")
+    return retrain(backend, start=start)
+
+
+def retrain(backend=None, start=None, activate=True, cache=True):
+    """Fetch the data, train and persist a new artifact version.
+
+    Pipeline stages whose inputs and parameters are unchanged are reused from
+    the stage cache unless ``cache`` is false.  With ``activate=False`` the
+    artifact is written but CURRENT is left alone, so a caller can validate
+    it before promoting it.
+    """
+    import artifacts
+    import drift
+    import pipeline
+
+    backend = backend or BACKEND
+    start = start if start is not None else time.perf_counter()
+    data_start = time.perf_counter()
+    data, source = load_data()
+    data_seconds = time.perf_counter() - data_start
+    synthetic = source == "synthetic"
+    # Like the artifact, stages fitted on the random fallback data are not kept.
+    run = pipeline.run(data, backend, cache=True if cache and not synthetic else None)
+    classifier, scaler, train_acc, test_acc, cv = run[:5]
+    # The data stage covers the dataset load as well as its fingerprint.
+    timings = dict(run.timings, data=data_seconds + run.timings["data"])
+    cached = dict(run.cached, data=source == "cache")
+    for phase, seconds in timings.items():
+        metrics.observe("diabetes_load_phase_seconds", seconds, phase=phase)
+    # Reference input distribution for the drift monitor (drift.py).
+    profile = drift.profile(data.drop(columns="Outcome").to_numpy())
+    version = None
+    # Never persist a model fitted on the random fallback data.
+    if not synthetic:
+        try:
+            meta = artifacts.save(
+                {"classifier": classifier, "scaler": scaler,
+                 "train_acc": train_acc, "test_acc": test_acc},
+                run.keys["data"], source=DATA_URL,
+                params=_params(backend),
+                extra={"kind": "full", "data_source": source, "cv": cv or None,
+                       "profile": profile},
+                activate=activate)
+            version = meta["version"]
+        except OSError as exc:
+            log.warning("Could not write model artifact: %s", exc)
+    info = {"path": "synthetic" if synthetic else "trained", "version": version,
+            "data": source, "cv": cv or None, "profile": profile, "timings": timings,
+            "cached": cached, "seconds": time.perf_counter() - start}
+    metrics.observe("diabetes_load_phase_seconds", info["seconds"], phase="total")
+    log.info("Trained model (%s) in %.1f ms: %s", info["path"], info["seconds"] * 1000,
+             pipeline.report(timings, cached))
+    return classifier, scaler, train_acc, test_acc, info
+
+
+# ── Scoring ───────────────────────────────────────────────────────────────────
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer():
+    """Process-wide compiled scorer, loaded on first use."""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                classifier, scaler, *_ = load()
+                _scorer = LinearScorer.from_model(classifier, scaler)
+    return _scorer
+
+
+def score_one(row, scorer=None):
+    """Score one patient given as 8 values in ``FEATURES`` order."""
+    return (scorer or get_scorer()).score_one(row)
+
+
+def score_batch(X, scorer=None):
+    """Score an ``(n, 8)`` array-like; returns ``Scores`` of arrays."""
+    return (scorer or get_scorer()).score(X)
+
+
+def score_file(source, out_path, rejects_path, scorer=None, **kwargs):
+    """Stream a CSV / Parquet cohort through the scorer (see ``batch.score_stream``)."""
+    import batch
+    return batch.score_stream(source, scorer or get_scorer(), out_path,
+                              rejects_path, **kwargs)
@@ -0,0 +1,154 @@
+"""Streaming input-drift monitor for served predictions.
+
+At training time ``profile(X)`` captures a reference profile of the inputs:
+per feature, ``BINS`` quantile bins (cut points from the training data), the
+share of training rows in each bin, and the mean and standard deviation.  It
+is plain JSON and is stored in the artifact's ``meta.json``.
+
+``DriftMonitor.update(X)`` folds scored rows into fixed-size state (one count
+per bin plus a running mean / variance per feature), so memory does not grow
+with traffic and an update costs O(1) per row.  ``report()`` compares the
+live distribution with the reference:
+
+* ``psi``  -- population stability index over the bins
+  (< 0.1 stable, 0.1-0.25 moderate shift, > ``PSI_THRESHOLD`` drift);
+* ``ks``   -- largest gap between the binned reference and live CDFs;
+* ``shift`` -- live mean minus reference mean, in reference standard deviations.
+
+A feature is flagged once at least ``MIN_COUNT`` rows were seen and its PSI
+exceeds ``PSI_THRESHOLD``.
+"""
+import bisect
+import os
+import threading
+
+import numpy as np
+
+from scorer import FEATURES
+
+BINS = 10
+PSI_THRESHOLD = float(os.environ.get("DIABETES_DRIFT_PSI", "0.25"))
+MIN_COUNT = int(os.environ.get("DIABETES_DRIFT_MIN_COUNT", "100"))
+# Floor for empty bins so PSI stays finite.
+EPSILON = 1e-4
+
+
+def _bin_counts(X, edges, width):
+    """Rows per bin for every feature, ``width`` slots each, flattened.
+
+    A value's bin is the number of cut points ``<=`` it.
+    """
+    columns = np.ascontiguousarray(X.T)
+    return np.concatenate([np.bincount(np.searchsorted(e, col, side="right"), minlength=width)
+                           for e, col in zip(edges, columns)])
+
+
+def profile(X, bins=BINS):
+    """Reference profile of the raw training inputs ``X`` (``FEATURES`` order)."""
+    X = np.asarray(X, dtype=np.float64)
+    qs = np.linspace(0, 1, bins + 1)[1:-1]
+    # Repeated cut points (e.g. the many zero Insulin readings) collapse, so
+    # some features get fewer bins.
+    edges = [np.unique(np.quantile(X[:, i], qs)) for i in range(X.shape[1])]
+    counts = [np.bincount(np.searchsorted(e, X[:, i], side="right"), minlength=len(e) + 1)
+              for i, e in enumerate(edges)]
+    return {
+        "features": list(FEATURES),
+        "count": int(len(X)),
+        "edges": [e.tolist() for e in edges],
+        "expected": [(c / len(X)).tolist() for c in counts],
+        "mean": X.mean(axis=0).tolist(),
+        "std": X.std(axis=0).tolist(),
+    }
+
+
+class DriftMonitor:
+    def __init__(self, reference, psi_threshold=PSI_THRESHOLD, min_count=MIN_COUNT):
+        self.reference = reference
+        self.psi_threshold = psi_threshold
+        self.min_count = min_count
+        edges = reference["edges"]
+        n_features = len(edges)
+        self._edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self._width = max(len(e) for e in edges) + 1
+        self._expected = np.zeros((n_features, self._width))
+        self._used = np.zeros((n_features, self._width), dtype=bool)
+        for i, e in enumerate(reference["expected"]):
+            self._expected[i, :len(e)] = e
+            self._used[i, :len(e)] = True
+        self._ref_mean = np.asarray(reference["mean"])
+        self._ref_std = np.where(np.asarray(reference["std"]) > 0, reference["std"], 1.0)
+        # Single rows take a pure-Python path (bisect into ``_rows``), which is
+        # several times cheaper than NumPy's per-call overhead on 8 values.
+        self._rows = [(e, i * self._width, mu)
+                      for i, (e, mu) in enumerate(zip(edges, reference["mean"]))]
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self._counts = [0] * self._expected.size
+            # Sums of (x - reference mean) and its square: the shift keeps the
+            # variance estimate well conditioned.
+            self._sum = [0.0] * len(self._rows)
+            self._sumsq = [0.0] * len(self._rows)
+
+    def update(self, X):
+        """Fold an ``(n, features)`` batch (or one row) of raw inputs into the state."""
+        if hasattr(X, "ndim") and X.ndim == 2 and len(X) == 1:
+            X = X[0]
+        if np.ndim(X) == 1:
+            self._update_row(X.tolist() if hasattr(X, "tolist") else X)
+            return
+        X = np.asarray(X, dtype=np.float64)
+        if not len(X):
+            return
+        binned = _bin_counts(X, self._edges, self._width).tolist()
+        d = X - self._ref_mean
+        sums, sumsq = d.sum(axis=0).tolist(), np.einsum("ij,ij->j", d, d).tolist()
+        with self._lock:
+            self._counts = [a + b for a, b in zip(self._counts, binned)]
+            self._sum = [a + b for a, b in zip(self._sum, sums)]
+            self._sumsq = [a + b for a, b in zip(self._sumsq, sumsq)]
+            self.count += len(X)
+
+    def _update_row(self, row):
+        with self._lock:
+            counts, sums, sumsq = self._counts, self._sum, self._sumsq
+            for i, (value, (edges, offset, mu)) in enumerate(zip(row, self._rows)):
+                counts[offset + bisect.bisect_right(edges, value)] += 1
+                d = value - mu
+                sums[i] += d
+                sumsq[i] += d * d
+            self.count += 1
+
+    def report(self):
+        """Per-feature drift scores; ``drifted`` lists the flagged features."""
+        with self._lock:
+            count = self.count
+            counts = np.array(self._counts, dtype=np.float64).reshape(self._expected.shape)
+            sums, sumsq = np.array(self._sum), np.array(self._sumsq)
+        features = []
+        if count:
+            actual = counts / count
+            exp = np.where(self._used, np.maximum(self._expected, EPSILON), 1.0)
+            act = np.where(self._used, np.maximum(actual, EPSILON), 1.0)
+            psi = ((act - exp) * np.log(act / exp)).sum(axis=1)
+            ks = np.abs(np.cumsum(actual, axis=1) - np.cumsum(self._expected, axis=1)).max(axis=1)
+            offset = sums / count
+            mean = self._ref_mean + offset
+            std = np.sqrt(np.maximum(sumsq / count - offset ** 2, 0.0))
+            shift = offset / self._ref_std
+        for i, name in enumerate(self.reference["features"]):
+            entry = {"feature": name, "psi": None, "ks": None, "shift": None,
+                     "mean": None, "std": None, "drift": False}
+            if count:
+                entry.update(psi=float(psi[i]), ks=float(ks[i]), shift=float(shift[i]),
+                             mean=float(mean[i]), std=float(std[i]),
+                             drift=bool(count >= self.min_count and psi[i] > self.psi_threshold))
+            features.append(entry)
+        return {"count": count, "reference_count": self.reference["count"],
+                "min_count": self.min_count, "psi_threshold": self.psi_threshold,
+                "drifted": [f["feature"] for f in features if f["drift"]],
+                "features": features}
@@ -0,0 +1,178 @@
+"""Incremental model updates from small batches of newly labelled records.
+
+An update never reads historical rows:
+
+1. the scaler's running mean / variance absorb the new batch
+   (``StandardScaler.partial_fit``);
+2. the linear weights are re-expressed for the new scaling so the decision
+   function is unchanged, then nudged with a few hinge-loss SGD passes over
+   the new batch only;
+3. the Platt sigmoid takes a few gradient steps on the same batch.
+
+Each update is published as a new artifact version whose ``meta.json`` records
+its parent, so the lineage back to the last full retrain is explicit.  Holdout
+accuracy for incremental and full models is appended to
+``<ARTIFACT_DIR>/accuracy.jsonl``; ``needs_rebuild()`` compares the latest of
+each to decide when drift makes a full retrain worthwhile.
+"""
+import copy
+import hashlib
+import json
+import os
+import time
+import warnings
+
+import numpy as np
+
+import artifacts
+from backends import CalibratedLinearModel
+
+LEARNING_RATE = 0.01
+ALPHA = 1e-4
+EPOCHS = 5
+BATCH_SIZE = 32
+PLATT_STEPS = 50
+REBUILD_TOLERANCE = 0.02
+
+
+# ── Model arithmetic ──────────────────────────────────────────────────────────
+def _platt(classifier):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return float(np.ravel(classifier.probA_)[0]), float(np.ravel(classifier.probB_)[0])
+
+
+def _sgd_hinge(w, b, X, y, lr, alpha, epochs, rng):
+    """Mini-batch subgradient descent on L2-regularised hinge loss, ``y`` in ±1."""
+    n = len(y)
+    for _ in range(epochs):
+        order = rng.permutation(n)
+        for start in range(0, n, BATCH_SIZE):
+            idx = order[start:start + BATCH_SIZE]
+            Xb, yb = X[idx], y[idx]
+            viol = yb * (Xb @ w + b) < 1.0
+            grad_w = alpha * w - (yb[viol, None] * Xb[viol]).sum(axis=0) / len(idx)
+            grad_b = -yb[viol].sum() / len(idx)
+            w = w - lr * grad_w
+            b = b - lr * grad_b
+    return w, b
+
+
+def _platt_steps(a, b, margin, y01, steps, lr=0.1):
+    """Gradient steps on log-loss of ``P = sigmoid(b - a * margin)``."""
+    for _ in range(steps):
+        p = 0.5 * (1.0 + np.tanh(0.5 * (b - a * margin)))
+        err = p - y01
+        a -= lr * float(np.mean(-err * margin))
+        b -= lr * float(np.mean(err))
+    return a, b
+
+
+def update(classifier, scaler, X_new, y_new, lr=LEARNING_RATE, alpha=ALPHA,
+           epochs=EPOCHS, seed=0):
+    """Return an updated ``(classifier, scaler)``; the inputs are not modified."""
+    X_new = np.asarray(X_new, dtype=np.float64)
+    y_new = np.asarray(y_new)
+    classes = np.asarray(classifier.classes_)
+
+    # Linear function in raw feature space under the old scaling.
+    coef = np.asarray(classifier.coef_, dtype=np.float64).ravel()
+    w_raw = coef / scaler.scale_
+    b_raw = float(np.ravel(classifier.intercept_)[0]) - float(scaler.mean_ @ w_raw)
+
+    new_scaler = copy.deepcopy(scaler)
+    with warnings.catch_warnings():
+        # The scaler may have been fitted on a DataFrame; arrays are fine here.
+        warnings.simplefilter("ignore", UserWarning)
+        new_scaler.partial_fit(X_new)
+    # Same raw-space function expressed in the new scaled space.
+    w = w_raw * new_scaler.scale_
+    b = b_raw + float(new_scaler.mean_ @ w_raw)
+
+    Xs = (X_new - new_scaler.mean_) / new_scaler.scale_
+    y_pm = np.where(y_new == classes[1], 1.0, -1.0)
+    w, b = _sgd_hinge(w, b, Xs, y_pm, lr, alpha, epochs, np.random.default_rng(seed))
+
+    platt_a, platt_b = _platt(classifier)
+    platt_a, platt_b = _platt_steps(platt_a, platt_b, Xs @ w + b,
+                                    (y_pm > 0).astype(np.float64), PLATT_STEPS)
+    model = CalibratedLinearModel.from_weights(w.reshape(1, -1), np.array([b]),
+                                               classes, platt_a, platt_b)
+    return model, new_scaler
+
+
+def holdout_accuracy(classifier, scaler, X, y):
+    Xs = (np.asarray(X, dtype=np.float64) - scaler.mean_) / scaler.scale_
+    return float(np.mean(classifier.predict(Xs) == np.asarray(y)))
+
+
+# ── Publishing ────────────────────────────────────────────────────────────────
+def _batch_hash(X, y):
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
+def publish_update(X_new, y_new, holdout=None, root=None, **kwargs):
+    """Update the CURRENT artifact with a labelled batch and publish the result.
+
+    ``holdout`` is an optional ``(X, y)`` pair used to log accuracy.  Returns
+    the new artifact's meta.
+    """
+    loaded = artifacts.load(root=root)
+    if loaded is None:
+        raise RuntimeError("No compatible model artifact to update; run a full train first")
+    bundle, parent = loaded
+    classifier, scaler = update(bundle["classifier"], bundle["scaler"],
+                                X_new, y_new, **kwargs)
+    test_acc = bundle["test_acc"]
+    if holdout is not None:
+        test_acc = holdout_accuracy(classifier, scaler, *holdout)
+    # Chained digest: identifies the parent's data plus every batch since.
+    digest = hashlib.sha256((parent["data_hash"] + _batch_hash(X_new, y_new))
+                            .encode()).hexdigest()
+    meta = artifacts.save(
+        {"classifier": classifier, "scaler": scaler,
+         "train_acc": bundle["train_acc"], "test_acc": test_acc},
+        digest, source=parent.get("source"), params=parent.get("params"), root=root,
+        extra={"kind": "incremental", "parent": parent["version"],
+               "base_data_hash": parent.get("base_data_hash", parent["data_hash"]),
+               "data_source": parent.get("data_source"),
+               "profile": parent.get("profile"),
+               "rows_added": int(len(y_new)),
+               "rows_seen": int(np.max(scaler.n_samples_seen_))})
+    if holdout is not None:
+        record_accuracy(meta["version"], "incremental", test_acc, root)
+    return meta
+
+
+# ── Accuracy tracking ─────────────────────────────────────────────────────────
+def _log_path(root=None):
+    return os.path.join(root or artifacts.ARTIFACT_DIR, "accuracy.jsonl")
+
+
+def record_accuracy(version, kind, accuracy, root=None):
+    os.makedirs(root or artifacts.ARTIFACT_DIR, exist_ok=True)
+    with open(_log_path(root), "a") as fh:
+        fh.write(json.dumps({"version": version, "kind": kind,
+                             "holdout_acc": accuracy, "time": time.time()}) + "\n")
+
+
+def accuracy_history(root=None):
+    try:
+        with open(_log_path(root)) as fh:
+            return [json.loads(line) for line in fh if line.strip()]
+    except OSError:
+        return []
+
+
+def needs_rebuild(tolerance=REBUILD_TOLERANCE, root=None):
+    """True when the latest incremental model trails the latest full retrain
+    on the holdout set by more than ``tolerance``."""
+    history = accuracy_history(root)
+    full = [r for r in history if r["kind"] == "full"]
+    inc = [r for r in history if r["kind"] == "incremental"]
+    if not full or not inc or inc[-1]["time"] < full[-1]["time"]:
+        return False
+    return inc[-1]["holdout_acc"] < full[-1]["holdout_acc"] - tolerance
@@ -0,0 +1,209 @@
+"""In-process latency histograms exposed in the Prometheus text format.
+
+Disabled unless ``DIABETES_METRICS=1``; when disabled ``timer()`` hands back a
+shared no-op context manager and ``observe()`` / ``inc()`` return at once, so
+instrumented call sites cost one attribute check.
+
+Each series keeps fixed cumulative buckets (what Prometheus scrapes) plus a
+bounded ring of the most recent samples for p50 / p99, so memory stays
+constant however long the process runs.
+
+Export:
+
+* ``render()`` returns the exposition text;
+* ``DIABETES_METRICS_FILE`` -- ``maybe_write_file()`` atomically rewrites that
+  file (node_exporter textfile collector), at most every ``FILE_INTERVAL`` s;
+* ``DIABETES_METRICS_PORT`` -- ``start_http_server()`` serves ``GET /metrics``
+  from a daemon thread.
+"""
+import bisect
+import contextlib
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+ENABLED = os.environ.get("DIABETES_METRICS", "").lower() in ("1", "true", "yes")
+METRICS_FILE = os.environ.get("DIABETES_METRICS_FILE")
+METRICS_PORT = os.environ.get("DIABETES_METRICS_PORT")
+FILE_INTERVAL = 5.0
+WINDOW = 2048
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "diabetes_load_phase_seconds": "Model load / training time by phase.",
+    "diabetes_score_seconds": "LinearScorer.score call latency.",
+    "diabetes_scored_rows_total": "Rows scored.",
+    "diabetes_rerun_seconds": "Full Streamlit script rerun time.",
+    "diabetes_render_seconds": "Hero / result card template render time.",
+    "diabetes_events_total": "Event counts.",
+}
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS, window=WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantiles(self, qs=(50, 99)):
+        if not self.recent:
+            return [float("nan")] * len(qs)
+        return [float(v) for v in np.percentile(np.fromiter(self.recent, float), qs)]
+
+
+_lock = threading.Lock()
+_histograms = {}   # (name, labels) -> Histogram
+_counters = {}     # (name, labels) -> float
+_last_write = 0.0
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, value, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(value)
+
+
+def inc(name, amount=1, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name, self.labels = name, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+_NOOP = contextlib.nullcontext()
+
+
+def timer(name, **labels):
+    """``with timer("diabetes_load_phase_seconds", phase="data"): ...``"""
+    return _Timer(name, labels) if ENABLED else _NOOP
+
+
+def snapshot():
+    """``[(name, labels, count, sum, p50, p99)]`` for display."""
+    with _lock:
+        items = [(name, dict(labels), h.count, h.sum, *h.quantiles())
+                 for (name, labels), h in sorted(_histograms.items())]
+        items += [(name, dict(labels), value, None, None, None)
+                  for (name, labels), value in sorted(_counters.items())]
+    return items
+
+
+def _labels(pairs, extra=()):
+    pairs = list(pairs) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def render():
+    lines = []
+    with _lock:
+        seen = set()
+        for (name, labels), h in sorted(_histograms.items()):
+            if name not in seen:
+                seen.add(name)
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} histogram"]
+            cumulative = 0
+            for bound, n in zip(h.buckets, h.counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {h.count}")
+            lines.append(f"{name}_sum{_labels(labels)} {h.sum:.9g}")
+            lines.append(f"{name}_count{_labels(labels)} {h.count}")
+        for (name, labels), value in sorted(_counters.items()):
+            if name not in seen:
+                seen.add(name)
+                lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} counter"]
+            lines.append(f"{name}{_labels(labels)} {value:.9g}")
+    return "\n".join(lines) + "\n"
+
+
+def maybe_write_file(path=None, force=False):
+    """Rewrite the metrics file if one is configured and the interval passed."""
+    global _last_write
+    path = path or METRICS_FILE
+    if not ENABLED or not path:
+        return
+    now = time.monotonic()
+    if not force and now - _last_write < FILE_INTERVAL:
+        return
+    _last_write = now
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as fh:
+        fh.write(render())
+    os.replace(tmp, path)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_http_server(port=None, host="0.0.0.0"):
+    """Serve ``GET /metrics`` on ``port`` from a daemon thread (once per process)."""
+    global _server
+    port = port or METRICS_PORT
+    if not ENABLED or not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = _make_server(host, int(port))
+    return _server
+
+
+def _make_server(host, port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http").start()
+    return server
@@ -0,0 +1,52 @@
+"""Export the fitted model as a small, versioned JSON document.
+
+The file holds everything scoring needs and nothing else: the scaler's mean
+and scale, the linear weights and bias, the Platt coefficients and the class
+labels, in ``FEATURES`` order.  ``tiny_scorer.TinyScorer`` loads it with the
+standard library alone.  Floats are written with ``repr`` precision, so the
+exported model scores exactly like the in-memory one.
+
+    {"format": "diabetes-linear", "format_version": 1, "model_version": "...",
+     "features": [...], "scaler": {"mean": [...], "scale": [...]},
+     "linear": {"coef": [...], "intercept": ...},
+     "platt": {"a": ..., "b": ...}, "classes": [0, 1]}
+"""
+import json
+import os
+import warnings
+
+import numpy as np
+
+from scorer import FEATURES
+
+FORMAT = "diabetes-linear"
+FORMAT_VERSION = 1
+
+
+def to_dict(classifier, scaler, model_version=None):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        platt_a = float(np.ravel(classifier.probA_)[0])
+        platt_b = float(np.ravel(classifier.probB_)[0])
+    return {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "model_version": model_version,
+        "features": list(FEATURES),
+        "scaler": {"mean": [float(v) for v in scaler.mean_],
+                   "scale": [float(v) for v in scaler.scale_]},
+        "linear": {"coef": [float(v) for v in np.ravel(classifier.coef_)],
+                   "intercept": float(np.ravel(classifier.intercept_)[0])},
+        "platt": {"a": platt_a, "b": platt_b},
+        "classes": [c.item() for c in np.asarray(classifier.classes_)],
+    }
+
+
+def export(classifier, scaler, path, model_version=None):
+    """Write the model to ``path`` atomically; returns the document."""
+    doc = to_dict(classifier, scaler, model_version)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as fh:
+        json.dump(doc, fh, indent=1)
+    os.replace(tmp, path)
+    return doc
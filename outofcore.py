@@ -0,0 +1,175 @@
+"""Out-of-core training on a memory-mapped float32 feature store.
+
+The store is an ``(n, 9)`` ``.npy`` array in ``dataset.COLUMNS`` order (the
+features, then ``Outcome``), as written by ``synthetic.write`` or
+``diabetes_cli.py synth``.  Training reads it chunk by chunk and never holds
+more than one scaled chunk in memory:
+
+1. one streaming pass fits the scaler (``StandardScaler.partial_fit``) and
+   counts the classes;
+2. ``EPOCHS`` passes of ``SGDClassifier.partial_fit`` (hinge loss, chunks
+   and rows within a chunk shuffled every epoch);
+3. one pass collects margins of the calibration rows for the Platt fit;
+4. one pass measures train and test accuracy.
+
+Rows are assigned to test / calibration / fit by a hash of their row index
+(``split``), so the split is a per-chunk mask rather than copied arrays or an
+index array, and is the same for every chunk size.  It is not stratified; at
+the row counts this path is meant for, class shares differ by a fraction of
+a percent.  Pages of the map are released after each chunk, so resident
+memory does not grow with the file.
+
+    classifier, scaler, train_acc, test_acc = train("cohort.npy")
+"""
+import mmap
+import time
+
+import numpy as np
+
+from backends import CALIBRATION_FRACTION, CALIBRATION_MAX_ROWS, CalibratedLinearModel, fit_platt
+
+CHUNKSIZE = 1 << 18
+EPOCHS = 5
+TEST_SIZE = 0.2
+ALPHA = 1e-4
+
+
+# ── Store ─────────────────────────────────────────────────────────────────────
+class FeatureStore:
+    """Read-only memory map of an ``(n, features + 1)`` ``.npy`` file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fh:
+            version = np.lib.format.read_magic(fh)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran, dtype = read_header(fh)
+            offset = fh.tell()
+            if fortran or len(shape) != 2:
+                raise ValueError(f"{path} is not a C-ordered 2-D array")
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.array = np.ndarray(shape, dtype, buffer=self._mmap, offset=offset)
+        self.array.flags.writeable = False
+        self._offset = offset
+        self._row_bytes = dtype.itemsize * shape[1]
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    def chunks(self, chunksize=CHUNKSIZE, order=None):
+        """Yield ``(start, X, y)`` views; each is invalid once the next is requested."""
+        starts = range(0, len(self), chunksize)
+        for start in (starts if order is None else (starts[i] for i in order)):
+            stop = min(start + chunksize, len(self))
+            block = self.array[start:stop]
+            yield start, block[:, :-1], block[:, -1]
+            self._release(start, stop)
+
+    def _release(self, start, stop):
+        # Drop the chunk's pages from this process; the kernel page cache
+        # keeps them, so a later pass re-reads without disk I/O.
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        lo = self._offset + start * self._row_bytes
+        hi = self._offset + stop * self._row_bytes
+        lo -= lo % mmap.PAGESIZE
+        self._mmap.madvise(mmap.MADV_DONTNEED, lo, hi - lo)
+
+    def close(self):
+        # Views handed out keep the map alive; it is unmapped with the last one.
+        self.array = None
+        self._mmap = None
+
+
+# ── Split ─────────────────────────────────────────────────────────────────────
+def _uniform(start, stop, seed):
+    """A uniform [0, 1) number per row index (splitmix64 of ``index + seed``)."""
+    z = np.arange(start, stop, dtype=np.uint64) + np.uint64(seed)
+    z = z * np.uint64(0x9E3779B97F4A7C15)
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+def split(start, stop, seed=2, test_size=TEST_SIZE):
+    """Masks ``(fit, calibration, test)`` for rows ``start`` to ``stop``."""
+    u = _uniform(start, stop, seed)
+    test = u < test_size
+    calibration = ~test & (u < test_size + (1 - test_size) * CALIBRATION_FRACTION)
+    return ~(test | calibration), calibration, test
+
+
+# ── Training ──────────────────────────────────────────────────────────────────
+def train(path, chunksize=CHUNKSIZE, epochs=EPOCHS, C=None, class_weight=None,
+          random_state=2, timings=None):
+    """Fit scaler + calibrated linear SVM on the store at ``path``.
+
+    Returns ``(classifier, scaler, train_acc, test_acc)`` like
+    ``diabetes_core.train``.  ``C`` and ``class_weight`` mean what they do for
+    the ``sgd`` backend; ``timings`` gets ``scale``, ``fit``, ``calibrate``
+    and ``evaluate`` seconds.
+    """
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    timings = timings if timings is not None else {}
+    store = FeatureStore(path)
+    try:
+        start = time.perf_counter()
+        scaler = StandardScaler()
+        class_counts = np.zeros(2, dtype=np.int64)
+        for first, X, y in store.chunks(chunksize):
+            scaler.partial_fit(X.astype(np.float64))
+            fit_rows, _, _ = split(first, first + len(X), random_state)
+            class_counts += np.bincount(y[fit_rows].astype(np.intp), minlength=2)
+        timings["scale"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        n_fit = int(class_counts.sum())
+        if class_weight == "balanced":
+            # partial_fit cannot derive these itself: it never sees all labels.
+            class_weight = {c: n_fit / (2.0 * max(int(k), 1)) for c, k in enumerate(class_counts)}
+        estimator = SGDClassifier(loss="hinge", alpha=1.0 / (C * n_fit) if C else ALPHA,
+                                  class_weight=class_weight, random_state=random_state)
+        rng = np.random.default_rng(random_state)
+        n_chunks = -(-len(store) // chunksize)
+        for _ in range(epochs):
+            for first, X, y in store.chunks(chunksize, order=rng.permutation(n_chunks)):
+                fit_rows, _, _ = split(first, first + len(X), random_state)
+                order = rng.permutation(np.flatnonzero(fit_rows))
+                Xs = (X[order] - scaler.mean_) / scaler.scale_
+                estimator.partial_fit(Xs, y[order].astype(np.intp), classes=[0, 1])
+        timings["fit"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        coef, intercept = estimator.coef_[0], estimator.intercept_[0]
+        margins, labels, kept = [], [], 0
+        for first, X, y in store.chunks(chunksize):
+            _, cal_rows, _ = split(first, first + len(X), random_state)
+            take = np.flatnonzero(cal_rows)[:CALIBRATION_MAX_ROWS - kept]
+            margins.append(((X[take] - scaler.mean_) / scaler.scale_) @ coef + intercept)
+            labels.append(y[take].astype(np.intp))
+            kept += len(take)
+            if kept >= CALIBRATION_MAX_ROWS:
+                break
+        platt_a, platt_b = fit_platt(np.concatenate(margins), np.concatenate(labels))
+        classifier = CalibratedLinearModel(estimator, platt_a, platt_b)
+        timings["calibrate"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        correct, total = np.zeros(2), np.zeros(2)
+        for first, X, y in store.chunks(chunksize):
+            fit_rows, _, test_rows = split(first, first + len(X), random_state)
+            hit = classifier.predict((X - scaler.mean_) / scaler.scale_) == y
+            for i, rows in enumerate((fit_rows, test_rows)):
+                correct[i] += hit[rows].sum()
+                total[i] += rows.sum()
+        train_acc, test_acc = (correct / np.maximum(total, 1)).tolist()
+        timings["evaluate"] = time.perf_counter() - start
+    finally:
+        store.close()
+    return classifier, scaler, train_acc, test_acc
@@ -0,0 +1,219 @@
+"""Staged, cached training pipeline shared by ``diabetes_core`` and the notebook.
+
+    data ─▶ scale ─▶ split ─▶ model ─▶ evaluate
+
+``data``      the training frame; its key is ``artifacts.data_hash`` (the
+              download itself is cached by ``dataset.py``)
+``scale``     fitted ``StandardScaler`` and the scaled feature matrix
+``split``     stratified train / test row indices
+``model``     the fitted classifier (``backends.fit``, or ``selection`` for
+              ``select``) and its CV results
+``evaluate``  train and test accuracy
+
+Every stage's key is a SHA-256 of the keys of the stages it reads, its own
+parameters, the library versions and ``SCHEMA``.  With a cache directory the
+output of each stage is pickled to ``<cache>/<stage>-<key>.pkl`` and loaded on
+the next run with the same key.  So changing only the model's hyperparameters
+reruns ``model`` and ``evaluate`` and reuses the scaled matrix and splits,
+and the same data and configuration always give back the same model.
+Entries are written once and never updated; delete the directory to reclaim
+space.
+
+    run = pipeline.run(data, backend="svc", params={"C": 0.1}, cache=True)
+    run.classifier, run.scaler, run.train_acc, run.test_acc
+    print(pipeline.report(run.timings, run.cached))
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from collections import namedtuple
+
+import numpy as np
+
+STAGES = ("data", "scale", "split", "model", "evaluate")
+SCHEMA = 1
+TEST_SIZE = 0.2
+RANDOM_STATE = 2
+
+log = logging.getLogger("diabetes.pipeline")
+
+Run = namedtuple("Run", ["classifier", "scaler", "train_acc", "test_acc", "cv",
+                         "timings", "cached", "keys"])
+
+
+def cache_dir():
+    """Default stage cache: ``stages/`` inside the model artifact directory."""
+    import artifacts
+    return os.path.join(artifacts.ARTIFACT_DIR, "stages")
+
+
+# ── Keys ──────────────────────────────────────────────────────────────────────
+def stage_keys(digest, backend, params=None, test_size=TEST_SIZE,
+               random_state=RANDOM_STATE):
+    """Cache key of every stage for data ``digest`` and the given configuration."""
+    import artifacts
+
+    libs = artifacts.library_versions()
+
+    def key(stage, parents, **stage_params):
+        blob = json.dumps({"stage": stage, "parents": parents, "params": stage_params,
+                           "libs": libs, "schema": SCHEMA}, sort_keys=True)
+        return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+    # ``select`` ignores ``params``, so they do not change its key.
+    model_params = {"backend": backend, "random_state": random_state,
+                    **({} if backend == "select" else params or {})}
+    if backend == "select":
+        import selection
+        model_params["search"] = selection.search_key()
+    keys = {"data": digest}
+    keys["scale"] = key("scale", [keys["data"]], scaler="standard")
+    keys["split"] = key("split", [keys["data"]], test_size=test_size, stratify=True,
+                        random_state=random_state)
+    keys["model"] = key("model", [keys["scale"], keys["split"]], **model_params)
+    keys["evaluate"] = key("evaluate", [keys["model"]])
+    return keys
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+def _path(root, stage, key):
+    return os.path.join(root, f"{stage}-{key}.pkl")
+
+
+def _read(root, stage, key):
+    if root is None:
+        return None
+    try:
+        with open(_path(root, stage, key), "rb") as fh:
+            return pickle.load(fh)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as exc:
+        log.warning("Ignoring unreadable %s stage cache %s: %s", stage, key, exc)
+        return None
+
+
+def _write(root, stage, key, value):
+    if root is None:
+        return
+    path = _path(root, stage, key)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    try:
+        os.makedirs(root, exist_ok=True)
+        with open(tmp, "wb") as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as exc:
+        log.warning("Could not write %s stage cache: %s", stage, exc)
+
+
+# ── Stages ────────────────────────────────────────────────────────────────────
+def _scale(data):
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    return {"scaler": scaler, "X": scaler.fit_transform(data.drop(columns="Outcome"))}
+
+
+def _split(y, test_size, random_state):
+    from sklearn.model_selection import train_test_split
+
+    # Same rows as splitting the arrays themselves with these arguments.
+    train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=test_size,
+                                           stratify=y, random_state=random_state)
+    return {"train": train_idx, "test": test_idx}
+
+
+def _model(data, X, split, backend, params, random_state):
+    import backends
+
+    phases, cv = {}, None
+    y_train = data["Outcome"].to_numpy()[split["train"]]
+    params = dict(params or {})
+    if backend == "select":
+        import selection
+        start = time.perf_counter()
+        raw_train = data.drop(columns="Outcome").to_numpy()[split["train"]]
+        best, results = selection.select(raw_train, y_train, random_state=random_state)
+        phases["select"] = time.perf_counter() - start
+        params = dict(best["params"])
+        backend = params.pop("backend")
+        cv = {"folds": selection.FOLDS, "mean": best["mean"], "std": best["std"],
+              "params": best["params"], "results": results}
+    classifier = backends.fit(backend, X[split["train"]], y_train,
+                              random_state=random_state, timings=phases, **params)
+    return {"classifier": classifier, "cv": cv, "phases": phases}
+
+
+def _evaluate(data, X, split, classifier):
+    from sklearn.metrics import accuracy_score
+
+    y = data["Outcome"].to_numpy()
+    return {name: accuracy_score(y[rows], classifier.predict(X[rows]))
+            for name, rows in (("train_acc", split["train"]), ("test_acc", split["test"]))}
+
+
+def holdout(data, test_size=TEST_SIZE, random_state=RANDOM_STATE):
+    """Raw ``(X, y)`` of the ``split`` stage's test rows of ``data``.
+
+    The rows every model trained on ``data`` with these arguments is scored
+    on, so models can be compared on the same held-out set.
+    """
+    y = data["Outcome"].to_numpy()
+    rows = _split(y, test_size, random_state)["test"]
+    return data.drop(columns="Outcome").to_numpy(dtype=np.float64)[rows], y[rows]
+
+
+# ── Run ───────────────────────────────────────────────────────────────────────
+def run(data, backend, params=None, cache=None, test_size=TEST_SIZE,
+        random_state=RANDOM_STATE, digest=None):
+    """Run the pipeline on ``data`` and return a ``Run``.
+
+    ``params`` are passed to ``backends.fit`` (``C``, ``class_weight``) and
+    ignored by ``select``, which picks its own.  ``cache`` is a directory,
+    ``True`` for ``cache_dir()``, or ``None`` / ``False`` to compute every stage.
+    ``digest`` saves hashing ``data`` when the caller already knows it.
+    ``timings`` holds seconds per stage (to compute or to load) plus, when
+    the model was fitted, its ``select`` / ``fit`` / ``calibrate`` phases;
+    ``cached`` tells which stages were loaded.
+    """
+    import artifacts
+
+    root = cache_dir() if cache is True else cache or None
+    timings, cached = {}, {}
+    start = time.perf_counter()
+    digest = digest or artifacts.data_hash(data)
+    timings["data"], cached["data"] = time.perf_counter() - start, False
+    keys = stage_keys(digest, backend, params, test_size, random_state)
+
+    def stage(name, compute):
+        start = time.perf_counter()
+        value = _read(root, name, keys[name])
+        cached[name] = value is not None
+        if value is None:
+            value = compute()
+            _write(root, name, keys[name], value)
+        timings[name] = time.perf_counter() - start
+        return value
+
+    scaled = stage("scale", lambda: _scale(data))
+    split = stage("split", lambda: _split(data["Outcome"].to_numpy(), test_size, random_state))
+    model = stage("model", lambda: _model(data, scaled["X"], split, backend, params,
+                                          random_state))
+    if not cached["model"]:
+        timings.update(model["phases"])
+    scores = stage("evaluate", lambda: _evaluate(data, scaled["X"], split, model["classifier"]))
+    log.debug("Training pipeline: %s", report(timings, cached))
+    return Run(model["classifier"], scaled["scaler"], scores["train_acc"], scores["test_acc"],
+               model["cv"], timings, cached, keys)
+
+
+def report(timings, cached=None):
+    """One line of per-stage milliseconds, e.g. for logs and the CLI."""
+    cached = cached or {}
+    return " · ".join(f"{name} {timings[name] * 1000:.1f} ms"
+                      + (" (cached)" if cached.get(name) else "")
+                      for name in STAGES if name in timings)
@@ -0,0 +1,63 @@
+"""Bounded, thread-safe LRU memoisation of single-patient scores.
+
+The form inputs are quantised (integers, BMI in 0.1 steps, DPF in 0.001
+steps), so each row maps to an exact integer tuple.  Keys also carry the model
+version; when a different version is bound the cache is cleared, so results
+from an old model are never served.
+"""
+import threading
+from collections import OrderedDict
+
+# Widget step per feature, in FEATURES order.
+STEPS = (1, 1, 1, 1, 1, 0.1, 0.001, 1)
+
+
+def quantise(row):
+    return tuple(int(round(float(v) / step)) for v, step in zip(row, STEPS))
+
+
+class PredictionCache:
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.version = None
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bind(self, version):
+        """Drop every entry if ``version`` differs from the bound model version."""
+        with self._lock:
+            if version != self.version:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self.version = version
+
+    def get_or_score(self, row, scorer, version):
+        self.bind(version)
+        key = (version, quantise(row))
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # Score outside the lock; a concurrent miss on the same key just
+        # computes the same value twice.
+        result = scorer.score_one(row)
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"size": len(self._data), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "invalidations": self.invalidations,
+                    "hit_rate": self.hits / total if total else 0.0,
+                    "version": self.version}
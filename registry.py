@@ -0,0 +1,277 @@
+"""In-process model registry with background retraining and atomic hot-swap.
+
+The registry always holds one ready ``Model``; readers call ``current()`` and
+never wait on training.  A daemon thread polls every ``POLL_SECONDS`` and
+retrains (without touching CURRENT) when
+
+* the local dataset cache changed (``diabetes_cli.py fetch-data``), or
+* ``RETRAIN_INTERVAL`` seconds passed since the last retrain (0 = never), or
+* ``request_retrain()`` was called.
+
+A candidate replaces the live model only if it passes validation: trained on
+real data and saved as an artifact, and, with both models scored on the same
+held-out rows (the pipeline's test split of the current dataset), accuracy
+at least ``MIN_ACCURACY`` and no more than ``MAX_ACCURACY_DROP`` below the
+live model's.  Without a real dataset there is no holdout and nothing is
+promoted automatically.  Training runs outside the registry lock; only
+validation and the swap hold it.  Promotion moves CURRENT and swaps the
+in-memory reference in one assignment.  Versions published elsewhere (``diabetes_cli.py update``) are
+adopted when CURRENT moves, after the same validation; a rejected one is
+reverted by pointing CURRENT back at the live model.  Rollbacks are operator
+decisions and skip validation.  Every decision is appended to
+``<ARTIFACT_DIR>/registry.jsonl``; ``rollback()`` re-promotes the previous one.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import artifacts
+import diabetes_core
+from drift import DriftMonitor
+from scorer import LinearScorer
+
+POLL_SECONDS = float(os.environ.get("DIABETES_REGISTRY_POLL", "30"))
+RETRAIN_INTERVAL = float(os.environ.get("DIABETES_RETRAIN_INTERVAL", "0"))
+MIN_ACCURACY = float(os.environ.get("DIABETES_MIN_ACCURACY", "0.70"))
+MAX_ACCURACY_DROP = float(os.environ.get("DIABETES_MAX_ACCURACY_DROP", "0.02"))
+
+log = logging.getLogger("diabetes.registry")
+
+Model = namedtuple("Model", ["classifier", "scaler", "scorer", "train_acc", "test_acc",
+                             "info", "version", "monitor"])
+
+
+def _model(classifier, scaler, train_acc, test_acc, info):
+    scorer = LinearScorer.from_model(classifier, scaler)
+    # Each model gets its own drift monitor, so a swap starts a fresh window
+    # against the new reference.  Artifacts saved before profiles existed
+    # have none and are not monitored.
+    monitor = DriftMonitor(info["profile"]) if info.get("profile") else None
+    return Model(classifier, scaler, scorer, train_acc, test_acc, info,
+                 info["version"] or scorer.fingerprint, monitor)
+
+
+def accuracy(model, holdout=None):
+    """Accuracy of ``model`` on ``holdout`` (raw ``(X, y)``), else its recorded one.
+
+    The recorded ``test_acc`` is only for display: models trained on other
+    data, or updated incrementally, were not scored on the same rows.  CV
+    means are only recorded for ``select`` models and are not used at all.
+    """
+    if holdout is None:
+        return model.test_acc
+    X, y = holdout
+    return float((model.scorer.score(X)[0] == y).mean())
+
+
+def holdout():
+    """Raw ``(X, y)`` test split of the current dataset, or ``None`` if synthetic."""
+    import pipeline
+
+    data, source = diabetes_core.load_data()
+    return None if source == "synthetic" else pipeline.holdout(data)
+
+
+def validate(candidate, live, holdout, min_accuracy=MIN_ACCURACY,
+             max_drop=MAX_ACCURACY_DROP):
+    """Return ``None`` if ``candidate`` may replace ``live``, else the reason.
+
+    Both models are scored on ``holdout``; with ``None`` the candidate is
+    unvalidated and refused.
+    """
+    if candidate.info.get("data") == "synthetic":
+        return "trained on synthetic data"
+    if not candidate.info["version"]:
+        return "artifact was not saved"
+    if holdout is None:
+        return "no holdout to validate on"
+    acc = accuracy(candidate, holdout)
+    if acc < min_accuracy:
+        return f"holdout accuracy {acc:.3f} below minimum {min_accuracy:.3f}"
+    if live is not None:
+        live_acc = accuracy(live, holdout)
+        if acc < live_acc - max_drop:
+            return f"holdout accuracy {acc:.3f} more than {max_drop:.3f} below live {live_acc:.3f}"
+    return None
+
+
+class ModelRegistry:
+    def __init__(self, backend=None, poll_seconds=POLL_SECONDS,
+                 retrain_interval=RETRAIN_INTERVAL):
+        self.backend = backend
+        self.poll_seconds = poll_seconds
+        self.retrain_interval = retrain_interval
+        self.status = "idle"
+        self.last_error = None
+        # Nothing to serve yet, so the very first load is synchronous.
+        self._model = _model(*diabetes_core.load(backend))
+        self._data_digest = self._dataset_digest()
+        self._last_retrain = time.monotonic()
+        self._lock = threading.Lock()   # serialises validate / promote / rollback
+        self._training = threading.Lock()  # one retrain at a time, outside _lock
+        self._wake = threading.Event()
+        self._retrain_requested = False
+        self._thread = None
+        self._stopped = False
+        self._rejected = None           # published version that failed validation
+        self._record("loaded", self._model)
+
+    # ── Reading ───────────────────────────────────────────────────────────────
+    def current(self):
+        return self._model
+
+    def history(self):
+        try:
+            with open(self._log_path()) as fh:
+                return [json.loads(line) for line in fh if line.strip()]
+        except OSError:
+            return []
+
+    # ── Background loop ───────────────────────────────────────────────────────
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name="model-registry")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def request_retrain(self):
+        self._retrain_requested = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            if self._stopped:
+                break
+            try:
+                self.poll()
+            except Exception as exc:  # keep serving whatever goes wrong
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self.status = "idle"
+                log.exception("Registry poll failed")
+
+    def poll(self):
+        """One iteration of the background loop (callable directly)."""
+        published = artifacts.current_version()
+        if published and published not in (self._model.info["version"], self._rejected):
+            self._adopt(published)
+        digest = self._dataset_digest()
+        due = self.retrain_interval > 0 and \
+            time.monotonic() - self._last_retrain >= self.retrain_interval
+        if self._retrain_requested or due or digest != self._data_digest:
+            self._retrain_requested = False
+            self._data_digest = digest
+            self.retrain()
+
+    # ── Transitions ───────────────────────────────────────────────────────────
+    def retrain(self):
+        """Train a candidate off to the side and promote it if it validates.
+
+        Returns ``None`` if it was rejected or another retrain is running.
+        """
+        if not self._training.acquire(blocking=False):
+            return None
+        try:
+            self.status = "training"
+            self._last_retrain = time.monotonic()
+            candidate = _model(*diabetes_core.retrain(self.backend, activate=False))
+            rows = holdout()
+        finally:
+            self.status = "idle"
+            self._training.release()
+        with self._lock:
+            reason = validate(candidate, self._model, rows)
+            if reason is not None:
+                self._record("rejected", candidate, reason)
+                log.warning("Rejected model %s: %s", candidate.version, reason)
+                return None
+            self._promote(candidate, "promoted")
+            return candidate
+
+    def rollback(self, version=None):
+        """Re-promote ``version``, or the model that was live before the current one.
+
+        The default skips versions an earlier rollback moved away from, so
+        repeated rollbacks walk back instead of flipping between two models.
+        With no earlier entry in the log it falls back to the artifact's
+        ``parent`` (the model an incremental update started from).
+        """
+        with self._lock:
+            version = version or self._rollback_target()
+            model = _model(*diabetes_core.load(self.backend, version=version))
+            self._promote(model, "rollback")
+            return model
+
+    def _rollback_target(self):
+        live = self._model.version
+        order, abandoned = [], set()
+        for e in self.history():
+            if e["event"] == "rollback":
+                abandoned.add(e["previous"])
+            elif e["event"] in ("loaded", "promoted", "adopted"):
+                abandoned.discard(e["version"])
+            else:
+                continue
+            order.append(e["version"])
+        earlier = [v for v in order if v != live and v not in abandoned]
+        if earlier:
+            return earlier[-1]
+        version = live
+        while version:
+            try:
+                version = artifacts.read_meta(version).get("parent")
+            except (OSError, ValueError):
+                break
+            if version and version not in abandoned:
+                return version
+        raise LookupError("No earlier model to roll back to")
+
+    def _adopt(self, version):
+        with self._lock:
+            try:
+                model = _model(*diabetes_core.load(self.backend, version=version))
+            except LookupError as exc:
+                self.last_error = str(exc)
+                return
+            mentions = [e for e in self.history() if e["version"] == version]
+            rolled_back = bool(mentions) and mentions[-1]["event"] == "rollback"
+            reason = None if rolled_back else validate(model, self._model, holdout())
+            if reason is not None:
+                self._rejected = version
+                self._record("rejected", model, reason)
+                log.warning("Rejected published model %s: %s", version, reason)
+                if self._model.info["version"]:
+                    artifacts.set_current(self._model.info["version"])
+                return
+            self._promote(model, "adopted", move_current=False)
+
+    def _promote(self, model, event, move_current=True):
+        if move_current:
+            artifacts.set_current(model.info["version"])
+        previous, self._model = self._model, model
+        self._record(event, model, previous=previous.version)
+        log.info("Model %s %s (was %s)", model.version, event, previous.version)
+
+    # ── Helpers ───────────────────────────────────────────────────────────────
+    def _dataset_digest(self):
+        import dataset
+        return dataset.cached_digest()
+
+    def _log_path(self):
+        return os.path.join(artifacts.ARTIFACT_DIR, "registry.jsonl")
+
+    def _record(self, event, model, reason=None, previous=None):
+        entry = {"time": time.time(), "event": event, "version": model.version,
+                 "accuracy": accuracy(model), "previous": previous, "reason": reason}
+        os.makedirs(os.path.dirname(self._log_path()), exist_ok=True)
+        with open(self._log_path(), "a") as fh:
+            fh.write(json.dumps(entry) + "\n")
@@ -0,0 +1,76 @@
+"""Fused NumPy scorer for the linear-kernel SVM.
+
+The scaler is folded into the SVM weights and the Platt sigmoid is applied in
+closed form, so a single matrix-vector product yields label, probability and
+margin for any batch size without going through sklearn input validation.
+"""
+import hashlib
+import time
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+import metrics
+
+# Column order the scaler and classifier were fitted on.
+FEATURES = ["Pregnancies", "Glucose", "BloodPressure", "SkinThickness",
+            "Insulin", "BMI", "DiabetesPedigreeFunction", "Age"]
+
+Scores = namedtuple("Scores", ["label", "proba", "margin"])
+
+
+class LinearScorer:
+    """``margin = x @ weights + bias``; ``P(diabetic) = sigmoid(-(A * margin) + B)``."""
+
+    def __init__(self, weights, bias, platt_a, platt_b, classes=(0, 1)):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64).ravel()
+        self.bias = float(bias)
+        self.platt_a = float(platt_a)
+        self.platt_b = float(platt_b)
+        self.classes = np.asarray(classes)
+
+    @classmethod
+    def from_model(cls, classifier, scaler):
+        """Compile a fitted ``StandardScaler`` + linear binary classifier."""
+        coef = np.asarray(classifier.coef_, dtype=np.float64).ravel()
+        intercept = float(np.ravel(classifier.intercept_)[0])
+        mean = np.asarray(scaler.mean_, dtype=np.float64)
+        scale = np.asarray(scaler.scale_, dtype=np.float64)
+        weights = coef / scale
+        bias = intercept - float(mean @ weights)
+        # sklearn flips libsvm's decision sign for binary problems, hence the
+        # ``A * f - B`` form rather than libsvm's ``A * f + B``.
+        with warnings.catch_warnings():
+            # SVC.probA_/probB_ are deprecated along with probability=True.
+            warnings.simplefilter("ignore", FutureWarning)
+            platt_a = float(np.ravel(classifier.probA_)[0])
+            platt_b = float(np.ravel(classifier.probB_)[0])
+        return cls(weights, bias, platt_a, platt_b, classifier.classes_)
+
+    @property
+    def fingerprint(self):
+        """Short digest of the parameters; identifies the model when unversioned."""
+        h = hashlib.sha256(self.weights.tobytes())
+        h.update(np.array([self.bias, self.platt_a, self.platt_b]).tobytes())
+        h.update(repr(self.classes.tolist()).encode())
+        return h.hexdigest()[:12]
+
+    def score(self, X):
+        start = time.perf_counter() if metrics.ENABLED else 0.0
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        margin = X @ self.weights + self.bias
+        t = self.platt_b - self.platt_a * margin
+        # tanh form of the logistic is overflow-free for large |t|.
+        proba = 0.5 * (1.0 + np.tanh(0.5 * t))
+        label = self.classes[(proba >= 0.5).astype(np.intp)]
+        if metrics.ENABLED:
+            metrics.observe("diabetes_score_seconds", time.perf_counter() - start)
+            metrics.inc("diabetes_scored_rows_total", len(margin))
+        return Scores(label, proba, margin)
+
+    def score_one(self, row):
+        label, proba, margin = self.score(row)
+        return Scores(label[0].item(), float(proba[0]), float(margin[0]))
@@ -0,0 +1,124 @@
+"""Stratified k-fold model selection over the linear training backends.
+
+Every candidate is a ``backends.fit`` configuration (backend, ``C``,
+``class_weight``).  The folds are split and their ``StandardScaler`` fitted
+once in the parent; the scaled fold arrays are shipped to each worker process
+once, through the pool initializer, and every (candidate, fold) task reuses
+them.  Only linear kernels are searched: the fused scorer, the JSON export and
+incremental updates all rely on the model being linear in the inputs.
+
+    best, results = select(X_train_raw, y_train)
+"""
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+FOLDS = 5
+GRID = {
+    "backend": ["svc", "linear"],
+    "C": [0.01, 0.1, 1.0, 10.0],
+    "class_weight": [None, "balanced"],
+}
+
+_worker_folds = None
+
+
+def candidates(grid=GRID):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def search_key(grid=GRID, folds=FOLDS):
+    """Short digest of the search space; part of the artifact parameters."""
+    blob = json.dumps({"grid": grid, "folds": folds}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:12]
+
+
+def scaled_folds(X, y, folds=FOLDS, random_state=2):
+    """Split ``X`` (raw features) and fit one scaler per fold.
+
+    Returns a list of ``(x_fit, y_fit, x_val, y_val)`` with both halves scaled
+    by the scaler fitted on that fold's training part.
+    """
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.preprocessing import StandardScaler
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    out = []
+    splitter = StratifiedKFold(folds, shuffle=True, random_state=random_state)
+    for fit_idx, val_idx in splitter.split(X, y):
+        scaler = StandardScaler().fit(X[fit_idx])
+        out.append((scaler.transform(X[fit_idx]), y[fit_idx],
+                    scaler.transform(X[val_idx]), y[val_idx]))
+    return out
+
+
+def _init_worker(folds):
+    global _worker_folds
+    _worker_folds = folds
+
+
+def _evaluate(candidate, fold, folds=None):
+    import warnings
+
+    import backends
+
+    x_fit, y_fit, x_val, y_val = (folds or _worker_folds)[fold]
+    params = dict(candidate)
+    with warnings.catch_warnings():
+        # Small C can leave liblinear short of convergence on some folds.
+        warnings.simplefilter("ignore")
+        # Folds only predict; the winner is refitted and calibrated afterwards.
+        model = backends.fit(params.pop("backend"), x_fit, y_fit, calibrate=False, **params)
+    return float(np.mean(model.predict(x_val) == y_val))
+
+
+def _mp_context():
+    # Not fork: select() runs in the Streamlit server and the registry's
+    # retrain thread, and forking a threaded process can deadlock on a lock
+    # another thread holds.  The fork server starts with the solvers imported.
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload(["selection", "backends", "sklearn.svm", "sklearn.linear_model"])
+    return ctx
+
+
+def select(X, y, grid=GRID, folds=FOLDS, n_jobs=None, random_state=2):
+    """Cross-validate every candidate in ``grid`` on raw features ``X``.
+
+    Returns ``(best, results)``: ``results`` holds one dict per candidate
+    with its parameters, fold accuracies and their mean / std, sorted best
+    first (highest mean, then lowest std).  ``best`` is ``results[0]``.
+    Above ``backends.SVC_MAX_ROWS`` rows ``svc`` candidates are skipped, as
+    ``auto`` would: libsvm is roughly quadratic in rows.
+    """
+    import backends
+
+    fold_data = scaled_folds(X, y, folds, random_state)
+    cands = candidates(grid)
+    if len(X) > backends.SVC_MAX_ROWS:
+        cands = [c for c in cands if c["backend"] != "svc"] or cands
+    tasks = [(c, f) for c in range(len(cands)) for f in range(folds)]
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, len(tasks)))
+    if n_jobs == 1:
+        scores = [_evaluate(cands[c], f, fold_data) for c, f in tasks]
+    else:
+        with ProcessPoolExecutor(n_jobs, mp_context=_mp_context(), initializer=_init_worker,
+                                 initargs=(fold_data,)) as pool:
+            scores = list(pool.map(_evaluate, [cands[c] for c, _ in tasks],
+                                   [f for _, f in tasks],
+                                   chunksize=max(1, len(tasks) // (4 * n_jobs))))
+
+    per_candidate = np.asarray(scores).reshape(len(cands), folds)
+    results = [{"params": cand, "fold_acc": [float(a) for a in accs],
+                "mean": float(accs.mean()), "std": float(accs.std())}
+               for cand, accs in zip(cands, per_candidate)]
+    results.sort(key=lambda r: (-r["mean"], r["std"]))
+    return results[0], results
@@ -0,0 +1,290 @@
+"""Local asyncio HTTP scoring service with dynamic micro-batching.
+
+    python server.py --port 8765 --max-batch 64 --max-wait-ms 2
+
+Endpoints::
+
+    POST /score   {"features": [8 numbers]} or {"Glucose": 120, ...}
+    GET  /health  model version, queue depth
+    GET  /stats   request counts, batch sizes, p50 / p99 enqueue-to-result latency,
+                  audit log counters
+    GET  /metrics Prometheus text format (with DIABETES_METRICS=1, see metrics.py)
+    GET  /drift   per-feature PSI / KS of served inputs vs. the training profile
+
+Every prediction is written to the audit log (``audit.py``); ``serve()``
+called with a ready-made ``scorer`` audits only if given an ``audit`` log.
+
+Concurrent requests are queued and scored together in one vectorised call.
+The batch grows while new requests keep arriving and is dispatched once
+``max_batch`` requests are waiting, ``max_wait_ms`` has passed since the
+first one arrived, or a turn of the event loop brings no new request, so a
+single client is not held for the window.  When the queue is full new
+requests get ``503`` at once.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+import diabetes_core
+import metrics
+from audit import AuditLog
+from drift import DriftMonitor
+from scorer import FEATURES, LinearScorer
+
+log = logging.getLogger("diabetes.server")
+
+MAX_BODY = 64 * 1024
+
+
+class Overloaded(Exception):
+    pass
+
+
+# ── Micro-batcher ─────────────────────────────────────────────────────────────
+class MicroBatcher:
+    def __init__(self, scorer, max_batch=64, max_wait_ms=2.0, max_queue=4096,
+                 latency_window=10_000, monitor=None, audit=None, model_version=None):
+        self.scorer = scorer
+        self.monitor = monitor
+        self.audit = audit
+        self.model_version = model_version
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.latencies = deque(maxlen=latency_window)
+        self.batch_sizes = deque(maxlen=latency_window)
+        self.requests = 0
+        self.rejected = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def score(self, row):
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((row, fut, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise Overloaded() from None
+        return await fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last = 1
+        while True:
+            items = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(items) < self.max_batch:
+                # Drain whatever is already queued.  Then, only if requests are
+                # arriving concurrently, yield once so those already readable
+                # can join, and stop as soon as a yield brings nothing new.
+                # A lone client is dispatched at once, never held for max_wait.
+                while len(items) < self.max_batch and not self.queue.empty():
+                    items.append(self.queue.get_nowait())
+                if (len(items) == 1 and last == 1) or loop.time() >= deadline:
+                    break
+                await asyncio.sleep(0)
+                if self.queue.empty():
+                    break
+            last = len(items)
+            self._dispatch(items)
+
+    def _dispatch(self, items):
+        X = np.array([row for row, _, _ in items], dtype=np.float64)
+        try:
+            label, proba, margin = self.scorer.score(X)
+        except Exception as exc:
+            for _, fut, _ in items:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        now = time.perf_counter()
+        if self.monitor is not None:
+            self.monitor.update(X)
+        if self.audit is not None:
+            self.audit.record_many(X, self.model_version, proba, label)
+        self.batch_sizes.append(len(items))
+        for i, (_, fut, queued) in enumerate(items):
+            self.latencies.append(now - queued)
+            if not fut.done():
+                fut.set_result((label[i].item(), float(proba[i]), float(margin[i])))
+        self.requests += len(items)
+
+    def stats(self):
+        lat = np.fromiter(self.latencies, dtype=np.float64)
+        sizes = np.fromiter(self.batch_sizes, dtype=np.float64)
+        pct = (np.percentile(lat, [50, 99]) * 1000).tolist() if lat.size else [None, None]
+        return {
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "queue_depth": self.queue.qsize(),
+            "mean_batch_size": float(sizes.mean()) if sizes.size else None,
+            "p50_ms": pct[0],
+            "p99_ms": pct[1],
+            "audit": self.audit.stats() if self.audit is not None else None,
+        }
+
+
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large",
+            503: "Service Unavailable"}
+
+
+def parse_features(payload):
+    if isinstance(payload, dict) and "features" in payload:
+        values = payload["features"]
+    elif isinstance(payload, dict):
+        values = [payload[name] for name in FEATURES]
+    else:
+        values = payload
+    row = [float(v) for v in values]
+    if len(row) != len(FEATURES) or not all(np.isfinite(row)):
+        raise ValueError(f"expected {len(FEATURES)} finite feature values")
+    return row
+
+
+class ScoringServer:
+    def __init__(self, batcher, model_version=None):
+        self.batcher = batcher
+        self.model_version = model_version
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self.route(method, path, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            return 200, {"status": "ok", "model_version": self.model_version,
+                         "queue_depth": self.batcher.queue.qsize()}
+        if path == "/stats":
+            return 200, self.batcher.stats()
+        if path == "/metrics":
+            return 200, metrics.render()
+        if path == "/drift":
+            if self.batcher.monitor is None:
+                return 404, {"error": "model has no reference profile; retrain it"}
+            return 200, self.batcher.monitor.report()
+        if path != "/score":
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            row = parse_features(json.loads(body or b"null"))
+        except (ValueError, KeyError, TypeError) as exc:
+            return 400, {"error": f"invalid input: {exc}"}
+        try:
+            label, proba, margin = await self.batcher.score(row)
+        except Overloaded:
+            return 503, {"error": "scoring queue full, retry later"}
+        return 200, {"prediction": label, "probability": proba, "margin": margin,
+                     "model_version": self.model_version}
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, ctype = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, ctype = json.dumps(payload).encode(), "application/json"
+        head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                f"Content-Type: {ctype}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8765, max_batch=64, max_wait_ms=2.0,
+                max_queue=4096, scorer=None, model_version=None, ready=None, monitor=None,
+                audit=None):
+    if scorer is None:
+        classifier, scaler, *_, info = diabetes_core.load()
+        scorer = LinearScorer.from_model(classifier, scaler)
+        model_version = info["version"]
+        if info.get("profile"):
+            monitor = DriftMonitor(info["profile"])
+        audit = AuditLog().start()
+    batcher = MicroBatcher(scorer, max_batch, max_wait_ms, max_queue, monitor=monitor,
+                           audit=audit, model_version=model_version)
+    batcher.start()
+    app = ScoringServer(batcher, model_version)
+    server = await asyncio.start_server(app.handle, host, port, backlog=1024)
+    log.info("Scoring server on http://%s:%d (max_batch=%d, max_wait=%.1f ms)",
+             host, port, max_batch, max_wait_ms)
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+        if audit is not None:
+            audit.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-batching diabetes scoring server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=64,
+                        help="1 disables batching (per-request scoring)")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--max-queue", type=int, default=4096)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms,
+                          args.max_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
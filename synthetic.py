@@ -0,0 +1,193 @@
+"""Seeded synthetic Pima-like cohorts of any size, with a known label model.
+
+Features come from a Gaussian copula: correlated standard normals (the Pima
+feature correlations) are mapped through each feature's quantile function,
+given as knots taken from the Pima data.  The knots include the point masses
+at zero that mark missing Glucose, BloodPressure, SkinThickness, Insulin and
+BMI readings.  Integer features are floored, BMI is rounded to 0.1 and the
+pedigree function to 0.001.
+
+Labels are drawn from the ground-truth logistic model ``risk(X)`` (fixed
+weights on standardised features, about 35% positive).  So a fitted model can
+be compared with the best achievable accuracy, ``bayes_accuracy``.
+
+Rows are generated in ``BLOCK``-row blocks, each from its own
+``default_rng([seed, block])`` stream.  The same ``(n, seed)`` therefore
+gives the same rows for any ``chunksize``, and any slice can be regenerated
+without the rows before it.  Writers hold one chunk in memory at a time:
+
+    X, y = generate(10_000, seed=0)
+    for X, y in iter_chunks(50_000_000, seed=0, chunksize=1 << 18): ...
+    write("cohort.parquet", 10_000_000)                    # .csv / .parquet / .npy
+"""
+import os
+import time
+
+import numpy as np
+
+from scorer import FEATURES
+
+BLOCK = 1 << 16
+
+# (cumulative probability, value) knots of each feature's quantile function.
+# For floored features a knot at ``(p, k + 1)`` after ``(p0, k)`` puts mass
+# ``p - p0`` on the value ``k``.
+QUANTILES = {
+    "Pregnancies": [(0, 0), (.145, 1), (.32, 2), (.45, 3), (.55, 4), (.64, 5), (.70, 6),
+                    (.77, 7), (.82, 8), (.87, 9), (.91, 10), (.94, 11), (.96, 12),
+                    (.98, 13), (.99, 14), (1, 18)],
+    "Glucose": [(0, 0), (.0065, 1), (.0066, 44), (.05, 80), (.25, 99), (.5, 117),
+                (.75, 140), (.9, 167), (.95, 181), (.99, 196), (1, 200)],
+    "BloodPressure": [(0, 0), (.046, 1), (.047, 24), (.1, 54), (.25, 62), (.5, 72),
+                      (.75, 80), (.9, 88), (.95, 90), (.99, 106), (1, 123)],
+    "SkinThickness": [(0, 0), (.296, 1), (.297, 7), (.4, 18), (.5, 23), (.75, 32),
+                      (.9, 40), (.95, 44), (.99, 51), (1, 100)],
+    "Insulin": [(0, 0), (.487, 1), (.488, 14), (.5, 30), (.6, 72), (.75, 127),
+                (.9, 210), (.95, 293), (.99, 520), (1, 847)],
+    "BMI": [(0, 0), (.014, 0), (.015, 18.2), (.05, 21.8), (.25, 27.3), (.5, 32.0),
+            (.75, 36.6), (.9, 41.5), (.95, 44.4), (.99, 50.8), (1, 67.1)],
+    "DiabetesPedigreeFunction": [(0, .078), (.05, .140), (.25, .244), (.5, .3725),
+                                 (.75, .626), (.9, .879), (.95, 1.133), (.99, 1.698),
+                                 (1, 2.42)],
+    "Age": [(0, 21), (.25, 24), (.5, 29), (.75, 41), (.9, 51), (.95, 58), (.99, 67),
+            (1, 82)],
+}
+DECIMALS = {"BMI": 1, "DiabetesPedigreeFunction": 3}   # the rest are floored integers
+
+# Latent correlations between the features, in ``FEATURES`` order.
+CORRELATION = np.array([
+    [1.00, 0.13, 0.14, -0.08, -0.07, 0.02, -0.03, 0.54],
+    [0.13, 1.00, 0.15, 0.06, 0.33, 0.22, 0.14, 0.26],
+    [0.14, 0.15, 1.00, 0.21, 0.09, 0.28, 0.04, 0.24],
+    [-0.08, 0.06, 0.21, 1.00, 0.44, 0.39, 0.18, -0.11],
+    [-0.07, 0.33, 0.09, 0.44, 1.00, 0.20, 0.19, -0.04],
+    [0.02, 0.22, 0.28, 0.39, 0.20, 1.00, 0.14, 0.04],
+    [-0.03, 0.14, 0.04, 0.18, 0.19, 0.14, 1.00, 0.03],
+    [0.54, 0.26, 0.24, -0.11, -0.04, 0.04, 0.03, 1.00],
+])
+
+# Ground-truth label model: logit = INTERCEPT + WEIGHTS . (x - MEAN) / STD.
+MEAN = np.array([3.85, 120.9, 69.1, 20.5, 79.8, 32.0, 0.472, 33.2])
+STD = np.array([3.37, 32.0, 19.4, 16.0, 115.2, 7.88, 0.331, 11.8])
+WEIGHTS = np.array([0.41, 1.12, -0.26, 0.01, -0.14, 0.71, 0.32, 0.18])
+INTERCEPT = -0.87
+
+_CHOLESKY = np.linalg.cholesky(CORRELATION)
+_KNOTS = [tuple(np.array(k, dtype=np.float64).T) for k in (QUANTILES[f] for f in FEATURES)]
+
+
+def risk(X):
+    """Ground-truth ``P(Outcome = 1)`` for raw feature rows."""
+    logit = INTERCEPT + ((np.asarray(X, dtype=np.float64) - MEAN) / STD) @ WEIGHTS
+    return 0.5 * (1.0 + np.tanh(0.5 * logit))
+
+
+def bayes_accuracy(X):
+    """Expected accuracy of the ideal classifier (``risk >= 0.5``) on ``X``."""
+    p = risk(X)
+    return float(np.maximum(p, 1 - p).mean())
+
+
+def _block(seed, index):
+    from scipy.special import ndtr
+
+    rng = np.random.default_rng([seed, index])
+    u = ndtr(rng.standard_normal((BLOCK, len(FEATURES))) @ _CHOLESKY.T)
+    X = np.empty_like(u)
+    for i, (name, (probs, values)) in enumerate(zip(FEATURES, _KNOTS)):
+        col = np.interp(u[:, i], probs, values)
+        if name in DECIMALS:
+            X[:, i] = np.round(col, DECIMALS[name])
+        else:
+            X[:, i] = np.minimum(np.floor(col), values[-1] - 1)
+    y = (rng.random(BLOCK) < risk(X)).astype(np.int8)
+    return X, y
+
+
+def generate(n, seed=0, start=0):
+    """Rows ``start`` to ``start + n`` of cohort ``seed`` as ``(X, y)``."""
+    stop = start + n
+    parts = []
+    for index in range(start // BLOCK, -(-stop // BLOCK)):
+        X, y = _block(seed, index)
+        lo = max(start - index * BLOCK, 0)
+        hi = min(stop - index * BLOCK, BLOCK)
+        parts.append((X[lo:hi], y[lo:hi]))
+    if not parts:
+        return np.empty((0, len(FEATURES))), np.empty(0, dtype=np.int8)
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def iter_chunks(n, seed=0, chunksize=BLOCK):
+    """Yield ``(X, y)`` chunks of at most ``chunksize`` rows covering ``n`` rows."""
+    # The current block is kept, so each is generated once even when chunk
+    # boundaries do not line up with block boundaries.
+    index, X_block, y_block = -1, None, None
+    for start in range(0, n, chunksize):
+        stop = min(start + chunksize, n)
+        parts, row = [], start
+        while row < stop:
+            if row // BLOCK != index:
+                index = row // BLOCK
+                X_block, y_block = _block(seed, index)
+            lo, hi = row - index * BLOCK, min(stop - index * BLOCK, BLOCK)
+            parts.append((X_block[lo:hi], y_block[lo:hi]))
+            row = index * BLOCK + hi
+        yield np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def frame(n, seed=0):
+    """``generate`` as a DataFrame with the ``dataset.COLUMNS`` layout."""
+    import pandas as pd
+
+    X, y = generate(n, seed)
+    data = pd.DataFrame(X, columns=FEATURES)
+    for name in FEATURES:
+        if name not in DECIMALS:
+            data[name] = data[name].astype(np.int64)
+    data["Outcome"] = y.astype(np.int64)
+    return data
+
+
+def write(path, n, seed=0, fmt=None, chunksize=BLOCK, dtype=np.float32):
+    """Write ``n`` rows to ``path`` chunk by chunk; returns a summary dict.
+
+    ``fmt`` is ``csv``, ``parquet`` or ``npy`` (default: from the extension).
+    ``npy`` writes an ``(n, 9)`` array of ``dtype`` in ``dataset.COLUMNS``
+    order through a memory map, ready for ``np.load(mmap_mode="r")``.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    start = time.perf_counter()
+    positives = 0
+    if fmt == "npy":
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype,
+                                        shape=(n, len(FEATURES) + 1))
+        row = 0
+        for X, y in iter_chunks(n, seed, chunksize):
+            out[row:row + len(X), :-1] = X
+            out[row:row + len(X), -1] = y
+            row += len(X)
+            positives += int(y.sum())
+        out.flush()
+        del out
+    elif fmt in ("csv", "parquet"):
+        import pandas as pd
+
+        import batch
+        writer = batch.ChunkWriter(path, fmt)
+        try:
+            for X, y in iter_chunks(n, seed, chunksize):
+                chunk = pd.DataFrame(X, columns=FEATURES)
+                for name in FEATURES:
+                    if name not in DECIMALS:
+                        chunk[name] = chunk[name].astype(np.int64)
+                chunk["Outcome"] = y.astype(np.int64)
+                writer.write(chunk)
+                positives += int(y.sum())
+        finally:
+            writer.close()
+    else:
+        raise ValueError(f"Unsupported cohort format {fmt!r}; use csv, parquet or npy")
+    return {"path": path, "rows": n, "seed": seed, "format": fmt,
+            "positive_rate": positives / n if n else 0.0,
+            "seconds": time.perf_counter() - start}
@@ -0,0 +1,73 @@
+"""Minimal scorer for models written by ``model_export`` (stdlib only).
+
+    from tiny_scorer import TinyScorer
+    scorer = TinyScorer.load("model.json")
+    label, proba, margin = scorer.score_one([1, 120, 70, 23, 80, 32.0, 0.47, 33])
+    labels, probas, margins = scorer.score(rows)      # needs NumPy
+
+Importing this module pulls in nothing beyond ``json`` and ``math``; NumPy is
+imported only by ``score`` for batches.  The arithmetic follows sklearn's
+order (standardise, then dot with the weights, then the Platt sigmoid), so
+results match ``scaler.transform`` + ``decision_function`` to rounding.
+"""
+import json
+import math
+
+FORMAT = "diabetes-linear"
+FORMAT_VERSION = 1
+
+
+class TinyScorer:
+    def __init__(self, mean, scale, coef, intercept, platt_a, platt_b,
+                 classes=(0, 1), features=None, model_version=None):
+        self.mean = [float(v) for v in mean]
+        self.scale = [float(v) for v in scale]
+        self.coef = [float(v) for v in coef]
+        self.intercept = float(intercept)
+        self.platt_a = float(platt_a)
+        self.platt_b = float(platt_b)
+        self.classes = list(classes)
+        self.features = list(features) if features else None
+        self.model_version = model_version
+        self._params = list(zip(self.mean, self.scale, self.coef))
+
+    @classmethod
+    def from_dict(cls, doc):
+        if doc.get("format") != FORMAT:
+            raise ValueError(f"not a {FORMAT} model file")
+        if doc.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported format_version {doc.get('format_version')!r}")
+        scaler, linear, platt = doc["scaler"], doc["linear"], doc["platt"]
+        if not len(scaler["mean"]) == len(scaler["scale"]) == len(linear["coef"]):
+            raise ValueError("scaler and weight lengths differ")
+        return cls(scaler["mean"], scaler["scale"], linear["coef"], linear["intercept"],
+                   platt["a"], platt["b"], doc.get("classes", (0, 1)),
+                   doc.get("features"), doc.get("model_version"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            return cls.from_dict(json.load(fh))
+
+    def score_one(self, row):
+        """``(label, proba, margin)`` for one row of raw feature values."""
+        if hasattr(row, "ravel"):  # NumPy array of shape (8,) or (1, 8)
+            row = row.ravel().tolist()
+        margin = self.intercept
+        for x, (m, s, c) in zip(row, self._params):
+            margin += (x - m) / s * c
+        proba = 0.5 * (1.0 + math.tanh(0.5 * (self.platt_b - self.platt_a * margin)))
+        return self.classes[proba >= 0.5], proba, margin
+
+    def score(self, X):
+        """Vectorised scoring of an ``(n, features)`` array-like."""
+        import numpy as np
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        margin = ((X - np.asarray(self.mean)) / np.asarray(self.scale)) @ np.asarray(self.coef)
+        margin += self.intercept
+        proba = 0.5 * (1.0 + np.tanh(0.5 * (self.platt_b - self.platt_a * margin)))
+        label = np.asarray(self.classes)[(proba >= 0.5).astype(np.intp)]
+        return label, proba, margin
@@ -0,0 +1,147 @@
+"""HTML fragments for the Streamlit UI, parsed once per process.
+
+``diabetes.py`` re-executes on every rerun, so anything defined there is
+rebuilt each time.  The templates live here instead: imported once, with
+indentation and inter-tag whitespace stripped, and filled with
+``string.Template.substitute``.  The theme stylesheet is linked from
+``static/theme.css`` (browser-cached) when Streamlit's static serving is on,
+and inlined only as a fallback.
+"""
+import hashlib
+import os
+import re
+from string import Template
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+THEME_PATH = os.path.join(STATIC_DIR, "theme.css")
+
+with open(THEME_PATH, "rb") as _fh:
+    _THEME = _fh.read()
+# Content hash in the URL lets browsers cache the stylesheet indefinitely.
+THEME_VERSION = hashlib.sha256(_THEME).hexdigest()[:10]
+
+# Files referenced by the @font-face rules in theme.css (SIL Open Font License);
+# ``python diabetes_cli.py fetch-fonts`` downloads them into static/fonts.
+_GF = "https://github.com/google/fonts/raw/main/ofl"
+FONT_FILES = {
+    "PlayfairDisplay-Variable.ttf": f"{_GF}/playfairdisplay/PlayfairDisplay%5Bwght%5D.ttf",
+    "IBMPlexMono-Light.ttf": f"{_GF}/ibmplexmono/IBMPlexMono-Light.ttf",
+    "IBMPlexMono-Regular.ttf": f"{_GF}/ibmplexmono/IBMPlexMono-Regular.ttf",
+    "IBMPlexMono-Medium.ttf": f"{_GF}/ibmplexmono/IBMPlexMono-Medium.ttf",
+}
+
+
+def _compact(html):
+    return re.sub(r">\s+<", "><", re.sub(r"\s+", " ", html)).strip()
+
+
+def theme_tag(static_serving):
+    if static_serving:
+        return f'<link rel="stylesheet" href="app/static/theme.css?v={THEME_VERSION}">'
+    return f"<style>{_compact(_THEME.decode())}</style>"
+
+
+HERO = Template(_compact("""
+<div class="hero">
+    <div class="hero-tag">⬡ Clinical Risk Intelligence</div>
+    <h1>Diabetes <span>Risk</span><br>Prediction System</h1>
+    <p class="hero-sub">
+        SVM · Pima Indians Diabetes Dataset &nbsp;·&nbsp;
+        <span class="$status_dot"></span>
+        <span class="status-badge">$status_text</span>
+    </p>
+    <div class="hero-badge">🩺</div>
+</div>
+<div class="acc-row">
+    <div class="acc-chip"><span>$train_acc%</span> Training Accuracy</div>
+    <div class="acc-chip"><span>$test_acc%</span> Test Accuracy</div>
+    $cv_chip
+    <div class="acc-chip"><span>768</span> Training Samples</div>
+    <div class="acc-chip"><span>8</span> Input Features</div>
+    <div class="acc-chip"><span>$cold_ms ms</span> Cold Start · $load_path</div>
+    <div class="acc-chip"><span>$model_version</span> Model Version</div>
+</div>
+"""))
+
+CV_CHIP = Template(_compact("""
+<div class="acc-chip"><span>$mean% ± $std</span> $folds-Fold CV Accuracy</div>
+"""))
+
+RESULT_DIABETIC = Template(_compact("""
+<div class="result-wrap">
+<div class="result-diabetic">
+    <span class="result-icon">🔴</span>
+    <div class="result-verdict red">Diabetic — High Risk</div>
+    <div style="font-size:0.82rem;color:#8a9aaa;margin-top:0.3rem">
+        Patient profile indicates elevated diabetes risk.
+    </div>
+    <div class="result-prob-row">
+        <span class="result-prob-label">Diabetes<br>Probability</span>
+        <div class="prob-bar-bg">
+            <div class="prob-bar-red" style="width:$risk_pct%"></div>
+        </div>
+        <span class="prob-pct red">$risk_pct%</span>
+    </div>
+    <div class="result-note">
+        ⚠ Model predicts a <strong style="color:#f43f5e">$risk_pct%</strong>
+        probability of diabetes based on the given parameters.
+        Please consult a qualified healthcare professional for
+        clinical diagnosis and treatment.
+    </div>
+</div>
+</div>
+"""))
+
+RESULT_SAFE = Template(_compact("""
+<div class="result-wrap">
+<div class="result-safe">
+    <span class="result-icon">🟢</span>
+    <div class="result-verdict teal">Non-Diabetic — Low Risk</div>
+    <div style="font-size:0.82rem;color:#8a9aaa;margin-top:0.3rem">
+        Patient parameters appear within a healthy range.
+    </div>
+    <div class="result-prob-row">
+        <span class="result-prob-label">Healthy<br>Confidence</span>
+        <div class="prob-bar-bg">
+            <div class="prob-bar-teal" style="width:$safe_pct%"></div>
+        </div>
+        <span class="prob-pct teal">$safe_pct%</span>
+    </div>
+    <div class="result-note">
+        ✅ Model confidence of <strong style="color:#2dd4bf">$safe_pct%</strong>
+        non-diabetic. Diabetes probability is only
+        <strong style="color:#f43f5e">$risk_pct%</strong>.
+        Maintain a balanced diet and schedule regular check-ups.
+    </div>
+</div>
+</div>
+"""))
+
+IDLE_CARD = _compact("""
+<div class="idle-card">
+    <div class="idle-icon">◈</div>
+    <div class="idle-head">Awaiting Analysis</div>
+    <div class="idle-body">
+        Enter patient metrics on the left<br>
+        and click <em>Analyse Diabetes Risk</em><br>
+        to generate a risk assessment.
+    </div>
+</div>
+""")
+
+DISCLAIMER = _compact("""
+<div style="margin-top:2rem;font-size:0.72rem;color:#2a4a50;
+            border-top:1px solid #182830;padding-top:1rem;line-height:1.7">
+    This tool is for educational and informational purposes only.
+    It does not constitute medical advice or replace clinical diagnosis
+    by a qualified healthcare provider.
+</div>
+""")
+
+BATCH_CHIPS = Template(_compact("""
+<div class="acc-row">
+    <div class="acc-chip"><span>$rows</span> Rows Scored</div>
+    <div class="acc-chip"><span>$rejected</span> Rejected</div>
+    <div class="acc-chip"><span>$rate</span> Rows / s</div>
+</div>
+"""))
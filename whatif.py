@@ -0,0 +1,59 @@
+"""Vectorised what-if sweeps around a single patient profile.
+
+One or two features are swept across their input ranges while the others stay
+fixed; the whole grid is built with broadcasting and scored in one
+``LinearScorer.score`` call, so a 200 x 200 grid is a single 40,000-row batch.
+"""
+import numpy as np
+
+from scorer import FEATURES
+
+# (low, high, integer) per feature, matching the input widgets.
+RANGES = {
+    "Pregnancies": (0, 17, True),
+    "Glucose": (50, 250, True),
+    "BloodPressure": (20, 140, True),
+    "SkinThickness": (0, 100, True),
+    "Insulin": (0, 850, True),
+    "BMI": (10.0, 70.0, False),
+    "DiabetesPedigreeFunction": (0.05, 2.5, False),
+    "Age": (21, 90, True),
+}
+
+# Display labels, matching the input widgets.
+LABELS = {
+    "Pregnancies": "Pregnancies", "Glucose": "Glucose (mg/dL)",
+    "BloodPressure": "Blood Pressure (mmHg)", "SkinThickness": "Skin Thickness (mm)",
+    "Insulin": "Insulin (µU/mL)", "BMI": "BMI (kg/m²)",
+    "DiabetesPedigreeFunction": "Diabetes Pedigree", "Age": "Age (years)",
+}
+
+
+def axis(feature, points=200):
+    """Evenly spaced sweep values; integer features never repeat a value."""
+    low, high, integer = RANGES[feature]
+    if integer:
+        points = min(points, int(high - low) + 1)
+        return np.unique(np.round(np.linspace(low, high, points)))
+    return np.linspace(low, high, points)
+
+
+def sweep(scorer, row, feature, points=200):
+    """Return ``(values, proba)`` for ``feature`` swept with ``row`` held fixed."""
+    values = axis(feature, points)
+    X = np.repeat(np.asarray(row, dtype=np.float64).reshape(1, -1), len(values), axis=0)
+    X[:, FEATURES.index(feature)] = values
+    return values, scorer.score(X).proba
+
+
+def grid(scorer, row, x_feature, y_feature, points=200):
+    """Return ``(xs, ys, proba)`` with ``proba`` shaped ``(len(ys), len(xs))``."""
+    if x_feature == y_feature:
+        raise ValueError("x and y features must differ")
+    xs, ys = axis(x_feature, points), axis(y_feature, points)
+    X = np.empty((len(ys), len(xs), len(FEATURES)))
+    X[...] = np.asarray(row, dtype=np.float64).ravel()
+    X[:, :, FEATURES.index(x_feature)] = xs[None, :]
+    X[:, :, FEATURES.index(y_feature)] = ys[:, None]
+    proba = scorer.score(X.reshape(-1, len(FEATURES))).proba
+    return xs, ys, proba.reshape(len(ys), len(xs))